@@ -0,0 +1,297 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Sequence
+
+from loguru import logger
+from neo4j import AsyncDriver, AsyncManagedTransaction
+from neo4j.exceptions import DriverError, Neo4jError
+from tqdm import tqdm
+
+from udelar_graph.models import Person, Work, WorkKeyword, WorkType
+from udelar_graph.repository import (
+    CREATE_PEOPLE_TO_WORK_QUERY,
+    CREATE_WORK_KEYWORD_QUERY,
+    CREATE_WORK_TYPE_QUERY,
+    DUPLICATED_PEOPLE_QUERY,
+    MERGE_PEOPLE_QUERY,
+    UPSERT_PERSON_QUERY,
+    UPSERT_WORK_QUERY,
+    PeopleToWorkRel,
+    partition_rows,
+    people_to_work_key,
+    people_to_work_row,
+    person_row,
+    work_keyword_key,
+    work_keyword_row,
+    work_row,
+    work_type_row,
+)
+
+
+@dataclass
+class AsyncUdelarGraphRepository:
+    """Asyncio version of `UdelarGraphRepository` built on the Neo4j async driver.
+
+    It has the same methods, as coroutines, and runs the same queries. Up to
+    `max_concurrency` chunks are written at the same time, shared by every call on
+    the repository, so several batches can be awaited together with
+    `asyncio.gather` or overlapped with other async work. Each relationship batch
+    is split with `partition_rows`, so the chunks of one call in flight never share
+    a node. Chunks of different calls running together may, and rely on the chunk
+    retries when they conflict on a lock.
+    """
+
+    driver: AsyncDriver
+    chunk_size: int = 1000
+    max_chunk_retries: int = 3
+    max_concurrency: int = 4
+    show_progress: bool = True
+    _semaphore: asyncio.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        """Close the Neo4j driver connection."""
+        await self.driver.close()
+
+    async def _write_chunk(
+        self,
+        tx_func: Callable[..., Awaitable[Any]],
+        chunk: Sequence,
+        *args,
+    ):
+        """Commit a single chunk on its own session, retrying on retryable errors."""
+        async with self._semaphore, self.driver.session() as session:
+            for attempt in range(1, self.max_chunk_retries + 1):
+                try:
+                    await session.execute_write(tx_func, chunk, *args)
+                    return
+                except (Neo4jError, DriverError) as e:
+                    if not e.is_retryable() or attempt == self.max_chunk_retries:
+                        raise
+                    logger.warning(
+                        f"Chunk of {len(chunk)} rows failed ({e}), "
+                        f"retrying ({attempt}/{self.max_chunk_retries})"
+                    )
+                    await asyncio.sleep(2**attempt)
+
+    async def _write_sequential(
+        self,
+        tx_func: Callable[..., Awaitable[Any]],
+        rows: Sequence,
+        *args,
+        pbar: tqdm,
+    ):
+        """Write `rows` chunk by chunk, waiting for each chunk to commit."""
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start : start + self.chunk_size]
+            await self._write_chunk(tx_func, chunk, *args)
+            pbar.update(len(chunk))
+
+    async def _write_chunked(
+        self,
+        tx_func: Callable[..., Awaitable[Any]],
+        rows: Sequence,
+        *args,
+        desc: str,
+    ):
+        """Write node rows in chunks of `chunk_size`, all of them in flight at once.
+
+        Args:
+            tx_func: Batch transaction function, called as `tx_func(tx, chunk, *args)`
+            rows: Rows to write
+            desc: Description shown in the progress bar
+        """
+        if len(rows) == 0:
+            return
+        with tqdm(total=len(rows), desc=desc, disable=not self.show_progress) as pbar:
+
+            async def write(chunk: Sequence):
+                await self._write_chunk(tx_func, chunk, *args)
+                pbar.update(len(chunk))
+
+            await asyncio.gather(
+                *(
+                    write(rows[start : start + self.chunk_size])
+                    for start in range(0, len(rows), self.chunk_size)
+                )
+            )
+
+    async def _write_partitioned(
+        self,
+        tx_func: Callable[..., Awaitable[Any]],
+        rows: Sequence,
+        *args,
+        key: Callable[[Any], tuple[str, str]],
+        desc: str,
+    ):
+        """Write relationship rows over partitions that never share a node.
+
+        The partitions of a round are written concurrently, each one chunk by chunk,
+        and a round waits for the previous one to finish.
+
+        Args:
+            tx_func: Batch transaction function, called as `tx_func(tx, chunk, *args)`
+            rows: Rows to write
+            key: Function returning the keys of the two nodes touched by a row
+            desc: Description shown in the progress bar
+        """
+        if len(rows) == 0:
+            return
+        rounds = partition_rows(rows, key, self.max_concurrency)
+        with tqdm(total=len(rows), desc=desc, disable=not self.show_progress) as pbar:
+            for partitions in rounds:
+                await asyncio.gather(
+                    *(
+                        self._write_sequential(tx_func, partition, *args, pbar=pbar)
+                        for partition in partitions
+                        if partition
+                    )
+                )
+
+    async def _create_person_batch_tx(
+        self, tx: AsyncManagedTransaction, persons: list[Person]
+    ):
+        result = await tx.run(
+            UPSERT_PERSON_QUERY, rows=[person_row(p) for p in persons]
+        )
+        await result.consume()
+
+    async def create_person(self, person: Person):
+        await self._write_chunk(self._create_person_batch_tx, [person])
+
+    async def create_person_batch(self, persons: list[Person]):
+        await self._write_chunked(self._create_person_batch_tx, persons, desc="People")
+
+    async def _merge_people_tx(
+        self, tx: AsyncManagedTransaction, keep_id: str, duplicate_ids: list[str]
+    ) -> int:
+        result = await tx.run(
+            MERGE_PEOPLE_QUERY, keep_id=keep_id, duplicate_ids=duplicate_ids
+        )
+        record = await result.single()
+        return record["merged"] if record else 0
+
+    async def dedupe_people(self) -> int:
+        """Merge person nodes that share a `normalized_name`.
+
+        See `UdelarGraphRepository.dedupe_people`.
+        """
+
+        async def read_groups(tx: AsyncManagedTransaction):
+            result = await tx.run(DUPLICATED_PEOPLE_QUERY)
+            return [r.data() async for r in result]
+
+        async with self.driver.session() as session:
+            groups = await session.execute_read(read_groups)
+            merged = 0
+            for group in tqdm(
+                groups, desc="Merging people", disable=not self.show_progress
+            ):
+                keep_id, *duplicate_ids = group["ids"]
+                merged += await session.execute_write(
+                    self._merge_people_tx, keep_id, duplicate_ids
+                )
+        return merged
+
+    async def _upsert_work_batch_tx(
+        self, tx: AsyncManagedTransaction, works: list[Work]
+    ):
+        result = await tx.run(UPSERT_WORK_QUERY, rows=[work_row(w) for w in works])
+        await result.consume()
+
+    async def create_work(self, work: Work):
+        await self._write_chunk(self._upsert_work_batch_tx, [work])
+
+    async def update_work(self, work: Work):
+        await self._write_chunk(self._upsert_work_batch_tx, [work])
+
+    async def create_works_batch(self, works: list[Work]):
+        await self._write_chunked(self._upsert_work_batch_tx, works, desc="Works")
+
+    async def update_works_batch(self, works: list[Work]):
+        await self._write_chunked(self._upsert_work_batch_tx, works, desc="Works")
+
+    async def _create_work_type_batch_tx(
+        self, tx: AsyncManagedTransaction, rels: list[tuple[Work, WorkType]]
+    ):
+        result = await tx.run(
+            CREATE_WORK_TYPE_QUERY, rows=[work_type_row(r) for r in rels]
+        )
+        await result.consume()
+
+    async def create_work_type(self, work: Work, type: WorkType):
+        await self._write_chunk(self._create_work_type_batch_tx, [(work, type)])
+
+    async def create_work_type_batch(self, rels: list[tuple[Work, WorkType]]):
+        # Few distinct types, every chunk would compete for the same nodes.
+        with tqdm(
+            total=len(rels), desc="Work types", disable=not self.show_progress
+        ) as pbar:
+            await self._write_sequential(
+                self._create_work_type_batch_tx, rels, pbar=pbar
+            )
+
+    async def _create_work_keyword_batch_tx(
+        self, tx: AsyncManagedTransaction, rels: list[tuple[Work, WorkKeyword]]
+    ):
+        result = await tx.run(
+            CREATE_WORK_KEYWORD_QUERY, rows=[work_keyword_row(r) for r in rels]
+        )
+        await result.consume()
+
+    async def create_work_keyword(self, work: Work, keyword: WorkKeyword):
+        await self._write_chunk(self._create_work_keyword_batch_tx, [(work, keyword)])
+
+    async def create_work_keyword_batch(self, rels: list[tuple[Work, WorkKeyword]]):
+        await self._write_partitioned(
+            self._create_work_keyword_batch_tx,
+            rels,
+            key=work_keyword_key,
+            desc="Work keywords",
+        )
+
+    async def _create_people_to_work_batch_tx(
+        self,
+        tx: AsyncManagedTransaction,
+        rels: list[tuple[Person, Work]],
+        rel: PeopleToWorkRel,
+    ):
+        result = await tx.run(
+            CREATE_PEOPLE_TO_WORK_QUERY.format(rel=rel),
+            rows=[people_to_work_row(r) for r in rels],
+        )
+        await result.consume()
+
+    async def create_authorship_relationship(self, person: Person, work: Work):
+        await self._write_chunk(
+            self._create_people_to_work_batch_tx, [(person, work)], "AUTHOR_OF"
+        )
+
+    async def create_contributor_relationship(self, person: Person, work: Work):
+        await self._write_chunk(
+            self._create_people_to_work_batch_tx, [(person, work)], "CONTRIBUTOR_OF"
+        )
+
+    async def create_authorship_relationship_batch(
+        self, rels: list[tuple[Person, Work]]
+    ):
+        await self._write_partitioned(
+            self._create_people_to_work_batch_tx,
+            rels,
+            "AUTHOR_OF",
+            key=people_to_work_key,
+            desc="Authorships",
+        )
+
+    async def create_contributor_relationship_batch(
+        self, rels: list[tuple[Person, Work]]
+    ):
+        await self._write_partitioned(
+            self._create_people_to_work_batch_tx,
+            rels,
+            "CONTRIBUTOR_OF",
+            key=people_to_work_key,
+            desc="Contributions",
+        )
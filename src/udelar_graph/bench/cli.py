@@ -0,0 +1,178 @@
+import json
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Literal
+
+import typer
+
+app = typer.Typer(
+    name="Udelar Graph benchmarks",
+    help="Benchmarks de carga con datos sintéticos.",
+    no_args_is_help=True,
+)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@app.command("load", help="Medir la carga de colibri y openalex con datos sintéticos")
+def bench_load(
+    works: int = typer.Option(1000, help="Cantidad de trabajos de colibri"),
+    people: int = typer.Option(300, help="Cantidad de personas distintas"),
+    openalex_works: int = typer.Option(1000, help="Cantidad de trabajos de openalex"),
+    collision_rate: float = typer.Option(
+        0.1,
+        help="Fracción de personas con el mismo apellido e inicial que otra",
+    ),
+    seed: int = typer.Option(0, help="Semilla de los datos generados"),
+    backend: str = typer.Option(
+        "memory",
+        help="Dónde escribir: 'memory' (sin base de datos) o 'neo4j'",
+    ),
+    chunk_size: int = typer.Option(1000, help="Cantidad de filas por transacción"),
+    workers: int = typer.Option(
+        1, help="Cantidad de hilos para escribir relaciones en paralelo"
+    ),
+    clear_db: bool = typer.Option(
+        False,
+        help="Borrar la base de datos antes de cargar, con --backend neo4j",
+    ),
+    workdir: Path | None = typer.Option(
+        None,
+        help="Directorio para los datos generados, por defecto uno temporal",
+    ),
+    output: Path = typer.Option(
+        Path("bench_results.json"),
+        help="Archivo JSON donde escribir los resultados",
+    ),
+):
+    import random
+
+    from udelar_graph.bench.generate import (
+        generate_colibri_tree,
+        generate_extracted_names,
+        generate_openalex_csv,
+        generate_people,
+    )
+    from udelar_graph.profiling import peak_rss_mb, record_stages
+
+    if backend not in ("memory", "neo4j"):
+        raise typer.BadParameter("backend must be 'memory' or 'neo4j'")
+
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="udegraph-bench-")
+        workdir = Path(tmp.name)
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    rng = random.Random(seed)
+    synthetic_people = generate_people(people, collision_rate, rng)
+    titles = generate_colibri_tree(workdir / "colibri", synthetic_people, works, rng)
+    generate_extracted_names(workdir / "extracted_names.json", synthetic_people)
+    generate_openalex_csv(
+        workdir / "openalex.csv", synthetic_people, titles, openalex_works, rng
+    )
+
+    repository, close = _open_backend(
+        backend, chunk_size=chunk_size, workers=workers, clear_db=clear_db
+    )
+
+    start = time.perf_counter()
+    with record_stages() as stages:
+        _run_load(repository, workdir)
+    total = time.perf_counter() - start
+    close()
+
+    results = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "params": {
+            "works": works,
+            "people": people,
+            "openalex_works": openalex_works,
+            "collision_rate": collision_rate,
+            "seed": seed,
+            "backend": backend,
+            "chunk_size": chunk_size,
+            "workers": workers,
+        },
+        "stages": [s.to_dict() for s in stages],
+        "total_seconds": total,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    with open(output, "w") as f:
+        json.dump(results, f, indent=4)
+
+    for s in stages:
+        rate = f"{s.rows_per_second:12.0f} rows/s" if s.rows_per_second else ""
+        typer.echo(f"{s.name:32} {s.seconds:9.3f}s {rate}")
+    typer.echo(f"{'total':32} {total:9.3f}s")
+    typer.echo(f"Peak RSS {results['peak_rss_mb']:.0f} MB, results in {output}")
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+def _open_backend(
+    backend: Literal["memory", "neo4j"] | str,
+    *,
+    chunk_size: int,
+    workers: int,
+    clear_db: bool,
+):
+    if backend == "memory":
+        from udelar_graph.memory_repository import InMemoryGraphRepository
+
+        memory_repository = InMemoryGraphRepository()
+        return memory_repository, memory_repository.close
+
+    from neo4j import GraphDatabase
+
+    from udelar_graph.repository import UdelarGraphRepository
+    from udelar_graph.schema import create_schema
+
+    driver = GraphDatabase.driver(
+        "bolt://localhost:7687",
+        auth=("neo4j", "password"),
+    )
+    if clear_db:
+        driver.execute_query("MATCH (n) DETACH DELETE n")
+    create_schema(driver)
+    repository = UdelarGraphRepository(
+        driver, chunk_size=chunk_size, workers=workers, show_progress=False
+    )
+    return repository, repository.close
+
+
+def _run_load(repository, workdir: Path):
+    from udelar_graph.load.colibri import load_colibri_outputs, populate_graph_colibri
+    from udelar_graph.load.openalex import load_openalex_works, scan_openalex_works
+
+    populate_graph_colibri(
+        repository,
+        data_dir=workdir / "colibri",
+        extracted_names_path=workdir / "extracted_names.json",
+        output_dir=workdir,
+    )
+    colibri_people, colibri_works = load_colibri_outputs(
+        workdir / "colibri_people.json", workdir / "colibri_works.json"
+    )
+    # the file is read while normalizing the authors
+    load_openalex_works(
+        scan_openalex_works(workdir / "openalex.csv"),
+        repository,
+        existing_people=colibri_people,
+        existing_works=colibri_works,
+    )
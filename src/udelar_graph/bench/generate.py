@@ -0,0 +1,199 @@
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+import polars as pl
+from unidecode import unidecode
+
+SURNAMES = [
+    "Pérez", "Rodríguez", "González", "Fernández", "López", "Martínez", "Gómez",
+    "Sosa", "Silva", "Castro", "Núñez", "Méndez", "Acosta", "Benítez", "Suárez",
+    "Álvarez", "Ramírez", "Cabrera", "Olivera", "Viera", "Pereira", "Da Silva",
+    "De León", "Correa", "Ferreira", "Techera", "Cardozo", "Píriz", "Umpiérrez",
+    "Bentancor", "Machado", "Larrosa", "Ibarra", "Sánchez", "Díaz", "Romero",
+    "Rosas", "Franco", "Barrios", "Quintana",
+]  # fmt: skip
+FIRST_NAMES = [
+    "Juan", "María", "José", "Ana", "Pablo", "Laura", "Diego", "Lucía", "Martín",
+    "Carolina", "Gonzalo", "Florencia", "Santiago", "Valentina", "Federico",
+    "Natalia", "Andrés", "Sofía", "Ignacio", "Camila", "Rodrigo", "Verónica",
+    "Sebastián", "Mariana", "Alejandro", "Paula", "Nicolás", "Gabriela",
+    "Fernando", "Cecilia", "Álvaro", "Inés",
+]  # fmt: skip
+WORDS = [
+    "análisis", "sistema", "redes", "grafos", "energía", "control", "modelo",
+    "distribuido", "eléctrica", "optimización", "aprendizaje", "datos", "señales",
+    "estructuras", "térmico", "simulación", "algoritmos", "sensores", "robusto",
+    "evaluación", "diseño", "implementación", "potencia", "mecánica", "fluidos",
+]  # fmt: skip
+WORK_TYPES = ["Tesis de grado", "Tesis de maestría", "Artículo", "Reporte técnico"]
+OPENALEX_TYPES = ["article", "preprint", "dissertation", "book-chapter"]
+DEPARTMENTS = [
+    "Instituto de Computación",
+    "Instituto de Ingeniería Eléctrica",
+    "Instituto de Ingeniería Mecánica",
+]
+
+
+@dataclass
+class SyntheticPerson:
+    surnames: str
+    first_names: str
+
+    def aliases(self) -> list[str]:
+        """Ways the person is written in Colibri: full, with initials and without
+        accents."""
+        initials = " ".join(f"{n[0]}." for n in self.first_names.split(" "))
+        return [
+            f"{self.surnames}, {self.first_names}",
+            f"{self.surnames}, {initials}",
+            unidecode(f"{self.surnames}, {self.first_names}"),
+        ]
+
+    def display_name(self) -> str:
+        """Name as written by OpenAlex."""
+        return f"{self.first_names} {self.surnames}"
+
+
+def generate_people(
+    n: int, collision_rate: float, rng: random.Random
+) -> list[SyntheticPerson]:
+    """Generate `n` distinct people.
+
+    A `collision_rate` fraction of them are namesakes of a previous person: same
+    surnames and a first name with the same initial, which are the hardest names
+    to tell apart when grouping aliases.
+    """
+    people: list[SyntheticPerson] = []
+    seen: set[tuple[str, str]] = set()
+    while len(people) < n:
+        if people and rng.random() < collision_rate:
+            other = rng.choice(people)
+            candidates = [
+                f
+                for f in FIRST_NAMES
+                if f[0] == other.first_names[0] and f != other.first_names
+            ] or FIRST_NAMES
+            surnames, first_names = other.surnames, rng.choice(candidates)
+        else:
+            surnames = " ".join(rng.sample(SURNAMES, 2))
+            first_names = " ".join(rng.sample(FIRST_NAMES, rng.choice([1, 1, 2])))
+        if (surnames, first_names) in seen:
+            continue
+        seen.add((surnames, first_names))
+        people.append(SyntheticPerson(surnames, first_names))
+    return people
+
+
+def _title(i: int, rng: random.Random) -> str:
+    words = " ".join(rng.sample(WORDS, 5))
+    return f"{words.capitalize()} {i}"
+
+
+def generate_colibri_tree(
+    data_dir: Path,
+    people: list[SyntheticPerson],
+    n_works: int,
+    rng: random.Random,
+) -> list[str]:
+    """Write `n_works` Colibri works as JSONL files under `data_dir`, with the
+    faculty/department layout read by `load_colibri_data`.
+
+    Returns:
+        list[str]: Titles of the generated works.
+    """
+    files = []
+    for department in DEPARTMENTS:
+        path = data_dir / "Facultad de Ingeniería" / department / "works.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        files.append(open(path, "w"))
+
+    titles = []
+    for i in range(n_works):
+        title = _title(i, rng)
+        titles.append(title)
+        authors = rng.sample(people, min(len(people), rng.randint(1, 4)))
+        contributors = rng.sample(people, min(len(people), rng.randint(0, 2)))
+        work_type = rng.choice(WORK_TYPES)
+        keywords = rng.sample(WORDS, 3) + [work_type]
+        row = {
+            "title": title,
+            "authors": [rng.choice(p.aliases()) for p in authors],
+            "contributors": [rng.choice(p.aliases()) for p in contributors],
+            "abstract": " ".join(rng.choices(WORDS, k=40)),
+            "type": work_type,
+            "pdf_url": None,
+            "source": f"https://www.colibri.udelar.edu.uy/jspui/handle/{i}",
+            "language": "spa",
+            "keywords": ["; ".join(keywords)],
+        }
+        files[i % len(files)].write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    for f in files:
+        f.close()
+    return titles
+
+
+def generate_extracted_names(path: Path, people: list[SyntheticPerson]):
+    """Write the extracted names file for the generated people, so the load runs
+    without calling OpenAI.
+
+    Every alias is included since the normalized name of a person is built from
+    whichever alias of their group is the shortest.
+    """
+    extracted = {}
+    for person in people:
+        for alias in person.aliases():
+            surnames, first_names = (x.strip() for x in alias.split(","))
+            key = (
+                unidecode(first_names.lower()).replace(" ", "_").replace(".", "")
+                + "_"
+                + unidecode(surnames.lower()).replace(" ", "_").replace(".", "")
+            )
+            extracted[key] = {
+                "surnames": person.surnames,
+                "first_names": person.first_names,
+                "person": True,
+            }
+    with open(path, "w") as f:
+        json.dump(extracted, f)
+
+
+def generate_openalex_csv(
+    path: Path,
+    people: list[SyntheticPerson],
+    colibri_titles: list[str],
+    n_works: int,
+    rng: random.Random,
+    repeated_rate: float = 0.3,
+):
+    """Write an OpenAlex works CSV with the columns read by `load_openalex_works`.
+
+    A `repeated_rate` fraction of the works repeat a Colibri title, some of them
+    with a typo, and the rest are new.
+    """
+    rows = []
+    for i in range(n_works):
+        if colibri_titles and rng.random() < repeated_rate:
+            title = rng.choice(colibri_titles)
+            if rng.random() < 0.5:
+                pos = rng.randrange(len(title))
+                title = title[:pos] + title[pos + 1 :]
+        else:
+            title = _title(n_works + i, rng)
+        authors = rng.sample(people, min(len(people), rng.randint(1, 5)))
+        rows.append(
+            {
+                "title": title,
+                "abstract": " ".join(rng.choices(WORDS, k=40)),
+                "language": rng.choice(["es", "en"]),
+                "type": rng.choice(OPENALEX_TYPES),
+                "primary_location.landing_page_url": f"https://doi.org/10.0/{i}",
+                "keywords.display_name": "|".join(rng.sample(WORDS, 3)),
+                "authorships.author.display_name": "|".join(
+                    p.display_name() for p in authors
+                ),
+            }
+        )
+    pl.DataFrame(rows).write_csv(path)
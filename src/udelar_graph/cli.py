@@ -3,6 +3,7 @@ from pathlib import Path
 import typer
 from typer import Typer
 
+from udelar_graph.bench.cli import app as bench_app
 from udelar_graph.extraction.cli import app as extraction_app
 
 app = Typer(
@@ -12,6 +13,75 @@ app = Typer(
 )
 
 app.add_typer(extraction_app, name="extraction")
+app.add_typer(bench_app, name="bench")
+
+
+@app.command("schema-init", help="Crear restricciones e índices de la base de datos")
+def schema_init(
+    check: bool = typer.Option(
+        False,
+        "--check",
+        help="Solo reportar las restricciones e índices faltantes",
+    ),
+):
+    from neo4j import GraphDatabase
+
+    from udelar_graph.schema import create_schema, missing_schema
+
+    driver = GraphDatabase.driver(
+        "bolt://localhost:7687",
+        auth=("neo4j", "password"),
+    )
+
+    if check:
+        missing = missing_schema(driver)
+        for item in missing:
+            typer.echo(f"Missing {item}")
+        driver.close()
+        if missing:
+            raise typer.Exit(1)
+        typer.echo("Schema is complete")
+        return
+
+    failed = create_schema(driver)
+    driver.close()
+    if failed:
+        raise typer.Exit(1)
+
+
+@app.command("dedupe-people", help="Unir personas duplicadas de la base de datos")
+def dedupe_people():
+    from neo4j import GraphDatabase
+
+    from udelar_graph.repository import UdelarGraphRepository
+    from udelar_graph.schema import create_schema
+
+    driver = GraphDatabase.driver(
+        "bolt://localhost:7687",
+        auth=("neo4j", "password"),
+    )
+
+    repository = UdelarGraphRepository(driver)
+    merged = repository.dedupe_people()
+    typer.echo(f"Merged {merged} duplicated people")
+    create_schema(driver)
+    repository.close()
+
+
+def _check_backend(backend: str, *, incremental: bool, async_load: bool = False):
+    if backend not in ("neo4j", "memory"):
+        raise typer.BadParameter("backend must be 'neo4j' or 'memory'")
+    if backend == "memory" and incremental:
+        raise typer.BadParameter("--incremental can't be used with --backend memory")
+    if backend == "memory" and async_load:
+        raise typer.BadParameter("--async can't be used with --backend memory")
+    if async_load and incremental:
+        raise typer.BadParameter("--incremental can't be used with --async")
+
+
+def _echo_summary(repository):
+    for label, count in repository.summary().items():
+        typer.echo(f"{label:16} {count}")
 
 
 @app.command("colibri-load", help="Cargar datos de colibri")
@@ -29,11 +99,105 @@ def load_colibri(
         "--extract",
         help="Extraer nombres faltantes con openai",
     ),
+    chunk_size: int = typer.Option(
+        1000,
+        help="Cantidad de filas por transacción",
+    ),
+    workers: int = typer.Option(
+        1,
+        help="Cantidad de hilos para escribir relaciones en paralelo",
+    ),
+    name_workers: int = typer.Option(
+        1,
+        help="Cantidad de procesos para comparar nombres",
+    ),
+    extracted_names: Path = typer.Option(
+        Path("data/extracted_names.sqlite"),
+        help="Nombres extraídos, en SQLite (.sqlite o .db) o en JSON; si la base "
+        "SQLite no existe se crea a partir del JSON con el mismo nombre",
+    ),
+    parsed_names_cache: Path | None = typer.Option(
+        None,
+        help="Archivo JSON donde guardar los nombres parseados entre cargas",
+    ),
+    extract_concurrency: int = typer.Option(
+        8,
+        help="Cantidad máxima de pedidos a openai en paralelo, con --extract",
+    ),
+    extract_rate: float = typer.Option(
+        5.0,
+        help="Cantidad de pedidos a openai por segundo, con --extract",
+    ),
+    extract_batch_size: int = typer.Option(
+        1,
+        help="Cantidad de nombres por pedido a openai, con --extract",
+    ),
+    local_confidence: float = typer.Option(
+        0.9,
+        help="Confianza mínima para resolver un nombre con reglas, sin openai; "
+        "más de 1 envía todos los nombres a openai",
+    ),
+    openai_base_url: str | None = typer.Option(
+        None,
+        help="URL de un servidor compatible con openai, por ejemplo uno de prueba",
+    ),
+    async_load: bool = typer.Option(
+        False,
+        "--async",
+        help="Escribir con el driver async mientras se agrupan y extraen los nombres",
+    ),
+    async_concurrency: int = typer.Option(
+        4,
+        help="Cantidad máxima de escrituras en paralelo, con --async",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Escribir solo lo que cambió desde la última carga",
+    ),
+    manifest: Path = typer.Option(
+        Path("data/load_manifest.json"),
+        help="Archivo con el registro de lo cargado, usado con --incremental",
+    ),
+    backend: str = typer.Option(
+        "neo4j",
+        help="Dónde escribir: 'neo4j' o 'memory' (sin base de datos, para medir "
+        "el costo de las transformaciones)",
+    ),
 ):
     from neo4j import GraphDatabase
 
     from udelar_graph.load.colibri import populate_graph_colibri
-    from udelar_graph.repository import UdelarGraphRepository
+    from udelar_graph.repository import GraphRepository, UdelarGraphRepository
+    from udelar_graph.schema import create_schema
+
+    _check_backend(backend, incremental=incremental, async_load=async_load)
+    name_extraction = None
+    if extract_missing_names:
+        from udelar_graph.processing.name_extraction import NameExtractionService
+
+        name_extraction = NameExtractionService(
+            base_url=openai_base_url,
+            max_concurrency=extract_concurrency,
+            requests_per_second=extract_rate,
+            batch_size=extract_batch_size,
+            local_confidence=local_confidence,
+        )
+    if backend == "memory":
+        from udelar_graph.memory_repository import InMemoryGraphRepository
+
+        memory_repository = InMemoryGraphRepository()
+        populate_graph_colibri(
+            memory_repository,
+            data_dir=data_dir,
+            extract_missing_names=extract_missing_names,
+            name_workers=name_workers,
+            parsed_names_path=parsed_names_cache,
+            extracted_names_path=extracted_names,
+            name_extraction=name_extraction,
+        )
+        _echo_summary(memory_repository)
+        return
 
     driver = GraphDatabase.driver(
         "bolt://localhost:7687",
@@ -41,12 +205,70 @@ def load_colibri(
     )
 
     if clear_db:
+        from udelar_graph.delta import clear_manifest
+
         driver.execute_query("MATCH (n) DETACH DELETE n")
+        clear_manifest(manifest)
 
-    repository = UdelarGraphRepository(driver)
+    create_schema(driver)
+
+    if async_load:
+        import asyncio
+
+        from neo4j import AsyncGraphDatabase
+
+        from udelar_graph.async_repository import AsyncUdelarGraphRepository
+        from udelar_graph.load.colibri import populate_graph_colibri_async
+
+        driver.close()
+
+        async def run():
+            async_repository = AsyncUdelarGraphRepository(
+                AsyncGraphDatabase.driver(
+                    "bolt://localhost:7687",
+                    auth=("neo4j", "password"),
+                ),
+                chunk_size=chunk_size,
+                max_concurrency=async_concurrency,
+            )
+            try:
+                await populate_graph_colibri_async(
+                    async_repository,
+                    data_dir=data_dir,
+                    extract_missing_names=extract_missing_names,
+                    name_workers=name_workers,
+                    parsed_names_path=parsed_names_cache,
+                    extracted_names_path=extracted_names,
+                    name_extraction=name_extraction,
+                )
+            finally:
+                await async_repository.close()
+                if name_extraction is not None:
+                    await name_extraction.close()
+
+        asyncio.run(run())
+        return
+
+    neo4j_repository = UdelarGraphRepository(
+        driver, chunk_size=chunk_size, workers=workers
+    )
+    repository: GraphRepository = neo4j_repository
+    delta = None
+    if incremental:
+        from udelar_graph.delta import DeltaRepository
+
+        repository = delta = DeltaRepository(neo4j_repository, "colibri", manifest)
     populate_graph_colibri(
-        repository, data_dir=data_dir, extract_missing_names=extract_missing_names
+        repository,
+        data_dir=data_dir,
+        extract_missing_names=extract_missing_names,
+        name_workers=name_workers,
+        parsed_names_path=parsed_names_cache,
+        extracted_names_path=extracted_names,
+        name_extraction=name_extraction,
     )
+    if delta is not None:
+        delta.commit()
     repository.close()
 
 
@@ -64,32 +286,170 @@ def load_openalex(
         Path("data/colibri_works.json"),
         help="Archivo de trabajos existentes",
     ),
+    chunk_size: int = typer.Option(
+        1000,
+        help="Cantidad de filas por transacción",
+    ),
+    workers: int = typer.Option(
+        1,
+        help="Cantidad de hilos para escribir relaciones en paralelo",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Escribir solo lo que cambió desde la última carga",
+    ),
+    manifest: Path = typer.Option(
+        Path("data/load_manifest.json"),
+        help="Archivo con el registro de lo cargado, usado con --incremental",
+    ),
+    backend: str = typer.Option(
+        "neo4j",
+        help="Dónde escribir: 'neo4j' o 'memory' (sin base de datos, partiendo de "
+        "las personas y trabajos de colibri existentes)",
+    ),
 ):
-    import json
-
-    import polars as pl
     from neo4j import GraphDatabase
 
-    from udelar_graph.load.openalex import load_openalex_works
-    from udelar_graph.models import Person, Work
-    from udelar_graph.repository import UdelarGraphRepository
+    from udelar_graph.load.colibri import load_colibri_outputs
+    from udelar_graph.load.openalex import load_openalex_works, scan_openalex_works
+    from udelar_graph.repository import GraphRepository, UdelarGraphRepository
+    from udelar_graph.schema import create_schema
+
+    _check_backend(backend, incremental=incremental)
+
+    data = scan_openalex_works(data_dir)
+    colibri_people, colibri_works = load_colibri_outputs(
+        existing_people_json, existing_works_json
+    )
+
+    if backend == "memory":
+        from udelar_graph.memory_repository import InMemoryGraphRepository
+
+        memory_repository = InMemoryGraphRepository()
+        memory_repository.create_person_batch(colibri_people)
+        memory_repository.create_works_batch(colibri_works)
+        load_openalex_works(
+            data,
+            memory_repository,
+            existing_people=colibri_people,
+            existing_works=colibri_works,
+        )
+        _echo_summary(memory_repository)
+        return
 
     driver = GraphDatabase.driver(
         "bolt://localhost:7687",
         auth=("neo4j", "password"),
     )
 
-    repository = UdelarGraphRepository(driver)
-
-    data = pl.read_csv(data_dir)
-    colibri_people = [
-        Person.model_validate(p) for p in json.load(existing_people_json.open("r"))
-    ]
-    colibri_works = [
-        Work.model_validate(w)
-        for w in json.load(existing_works_json.open("r")).values()
-    ]
+    create_schema(driver)
+    neo4j_repository = UdelarGraphRepository(
+        driver, chunk_size=chunk_size, workers=workers
+    )
+    repository: GraphRepository = neo4j_repository
+    delta = None
+    if incremental:
+        from udelar_graph.delta import DeltaRepository
 
+        repository = delta = DeltaRepository(neo4j_repository, "openalex", manifest)
     load_openalex_works(
         data, repository, existing_people=colibri_people, existing_works=colibri_works
     )
+    if delta is not None:
+        delta.commit()
+    repository.close()
+
+
+@app.command(
+    "extracted-names-migrate",
+    help="Copiar los nombres extraídos del archivo JSON a SQLite",
+)
+def migrate_extracted_names(
+    json_path: Path = typer.Option(
+        Path("data/extracted_names.json"),
+        "--json",
+        help="Archivo JSON con los nombres extraídos",
+    ),
+    db_path: Path = typer.Option(
+        Path("data/extracted_names.sqlite"),
+        "--db",
+        help="Base SQLite donde copiar los nombres, se crea si no existe",
+    ),
+):
+    from udelar_graph.load.colibri import migrate_extracted_names
+
+    count = migrate_extracted_names(json_path, db_path)
+    typer.echo(f"Copied {count} extracted names to {db_path}")
+
+
+@app.command(
+    "ingest",
+    help="Convertir los datos de colibri y openalex a datasets Parquet",
+)
+def ingest(
+    colibri_dir: Path = typer.Option(
+        Path("data/colibri"), help="Directorio con los datos de colibri"
+    ),
+    openalex_data: Path | None = typer.Option(
+        None, help="CSV con los trabajos de openalex, si se quiere convertir"
+    ),
+    output_dir: Path = typer.Option(
+        Path("data/parquet"),
+        help="Directorio donde escribir los datasets y el manifiesto",
+    ),
+):
+    from udelar_graph.load.colibri import ingest_colibri
+    from udelar_graph.load.openalex import ingest_openalex
+
+    count = ingest_colibri(colibri_dir, output_dir)
+    typer.echo(f"Wrote {count} colibri works to {output_dir}")
+    if openalex_data is not None:
+        count = ingest_openalex(openalex_data, output_dir)
+        typer.echo(f"Wrote {count} openalex works to {output_dir}")
+
+
+@app.command(
+    "export-import-files",
+    help="Exportar archivos CSV para importar con neo4j-admin",
+)
+def export_import_files(
+    data_dir: Path = typer.Option(
+        Path("data/colibri"),
+        help="Directorio de datos de colibri",
+    ),
+    openalex_data: Path | None = typer.Option(
+        None,
+        help="Archivo de datos de openalex, si no se indica solo se exporta colibri",
+    ),
+    output_dir: Path = typer.Option(
+        Path("data/import"),
+        help="Directorio donde escribir los archivos",
+    ),
+    extract_missing_names: bool = typer.Option(
+        False,
+        "--extract",
+        help="Extraer nombres faltantes con openai",
+    ),
+):
+    from udelar_graph.export import ImportFilesWriter
+    from udelar_graph.load.colibri import load_colibri_outputs, populate_graph_colibri
+    from udelar_graph.load.openalex import load_openalex_works, scan_openalex_works
+
+    writer = ImportFilesWriter()
+    populate_graph_colibri(
+        writer, data_dir=data_dir, extract_missing_names=extract_missing_names
+    )
+    if openalex_data is not None:
+        colibri_people, colibri_works = load_colibri_outputs()
+        load_openalex_works(
+            scan_openalex_works(openalex_data),
+            writer,
+            existing_people=colibri_people,
+            existing_works=colibri_works,
+        )
+
+    command = writer.write(output_dir)
+    typer.echo("Import the files with the database stopped:\n")
+    typer.echo(command)
+    typer.echo("\nand then run `udegraph schema-init` to create the constraints.")
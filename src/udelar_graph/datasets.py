@@ -0,0 +1,110 @@
+import hashlib
+import json
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+DATASETS_DIR = Path("data/parquet")
+MANIFEST_FILE = "manifest.json"
+
+
+def source_fingerprint(source: Path, pattern: str | None = None) -> str:
+    """
+    Hash of the path, size and modification time of the raw input, to detect that
+    it changed after it was converted.
+
+    Args:
+        source (Path): Raw file, or directory with the raw files.
+        pattern (str, optional): Glob of the raw files inside a directory.
+    """
+    paths = sorted(source.glob(pattern)) if pattern is not None else [source]
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def read_manifest(dataset_dir: Path = DATASETS_DIR) -> dict[str, dict]:
+    """Datasets converted by `udegraph ingest`, by name."""
+    path = dataset_dir / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_dataset(
+    data: pl.DataFrame,
+    name: str,
+    *,
+    source: Path,
+    fingerprint: str,
+    partition_by: str,
+    dataset_dir: Path = DATASETS_DIR,
+):
+    """
+    Write `data` as a Parquet dataset partitioned by `partition_by`, in hive
+    layout, replacing the previous version, and record it in the manifest.
+
+    Args:
+        data (pl.DataFrame): Rows of the dataset.
+        name (str): Name of the dataset, also its directory in `dataset_dir`.
+        source (Path): Raw input the dataset was converted from.
+        fingerprint (str): `source_fingerprint` of the raw input.
+        partition_by (str): Column used to split the files.
+        dataset_dir (Path, optional): Directory of the datasets and the manifest.
+    """
+    path = dataset_dir / name
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+    data.write_parquet(path, partition_by=partition_by)
+
+    manifest = read_manifest(dataset_dir)
+    manifest[name] = {
+        "source": str(source),
+        "fingerprint": fingerprint,
+        "rows": len(data),
+        "partition_by": partition_by,
+        "schema": {column: str(dtype) for column, dtype in data.schema.items()},
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(dataset_dir / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    logger.info(f"Wrote {len(data)} rows to the {name} dataset in {path}")
+
+
+def scan_dataset(
+    name: str,
+    *,
+    source: Path,
+    fingerprint: str,
+    dataset_dir: Path = DATASETS_DIR,
+) -> pl.LazyFrame | None:
+    """
+    Scan the dataset converted from `source`, if it exists and the raw input
+    didn't change since.
+
+    Returns:
+        pl.LazyFrame | None: The dataset, with the partition column, or None if it
+            has to be read from the raw input.
+    """
+    entry = read_manifest(dataset_dir).get(name)
+    if entry is None or entry["source"] != str(source):
+        return None
+    if entry["fingerprint"] != fingerprint:
+        logger.warning(
+            f"{source} changed since the {name} dataset was written, reading it "
+            "instead. Run `udegraph ingest` to update the dataset."
+        )
+        return None
+    logger.info(f"Reading the {name} dataset from {dataset_dir / name}")
+    return pl.scan_parquet(
+        dataset_dir / name,
+        hive_partitioning=True,
+        hive_schema={entry["partition_by"]: pl.String},
+    )
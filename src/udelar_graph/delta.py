@@ -0,0 +1,299 @@
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from loguru import logger
+from pydantic import BaseModel
+
+from udelar_graph.models import Person, Work, WorkKeyword, WorkType, content_hash
+from udelar_graph.repository import (
+    UdelarGraphRepository,
+    people_to_work_key,
+    work_keyword_key,
+)
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+NODE_KINDS = ("Person", "Work")
+REL_KINDS = ("AUTHOR_OF", "CONTRIBUTOR_OF", "TYPE", "KEYWORD")
+
+
+def _work_type_key(rel: tuple[Work, WorkType]) -> tuple[str, str]:
+    work, type = rel
+    return work.normalized_title, type.type
+
+
+def _keys(source: dict, kind: str) -> set:
+    """Keys of the nodes or relationships of `kind` written by a source."""
+    if kind in NODE_KINDS and "hashes" in source:
+        return set(source["hashes"].get(kind, {}))
+    return {tuple(x) if isinstance(x, list) else x for x in source.get(kind, [])}
+
+
+@dataclass
+class LoadManifest:
+    """Record of what was loaded into the graph.
+
+    Attributes:
+        generation: Number of the last committed load, of any source.
+        nodes: Generation in which every node in the graph was created, by kind and
+            key. It is shared by all the sources, so the relationships a source
+            wrote to a node that was deleted and created again since are written
+            again.
+        sources: For each source, the generation of its last load, the
+            `content_hash` it last wrote for each node (`hashes`, by kind and key)
+            and the keys of the relationships it wrote. Each source compares the
+            nodes against its own hashes, so a node enriched by another source
+            isn't written back and forth between them.
+    """
+
+    generation: int = 0
+    nodes: dict[str, dict[str, int]] = field(
+        default_factory=lambda: {k: {} for k in NODE_KINDS}
+    )
+    sources: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "LoadManifest":
+        if not path.exists():
+            return cls()
+        with open(path, "r") as f:
+            data = json.load(f)
+        # manifests written before the per-source hashes stored [hash, generation]
+        for nodes in data.get("nodes", {}).values():
+            for key, value in nodes.items():
+                if isinstance(value, list):
+                    nodes[key] = value[1]
+        return cls(**data)
+
+    def save(self, path: Path):
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "generation": self.generation,
+                    "nodes": self.nodes,
+                    "sources": self.sources,
+                },
+                f,
+            )
+
+
+@dataclass
+class DeltaRepository:
+    """Wraps a `UdelarGraphRepository` and only forwards what changed since the last
+    load of `source`.
+
+    Nodes are compared by the content hash the source wrote last time, the same
+    one the repository stores in the `content_hash` property, and written again if
+    it changed or the node is no longer in the graph. A relationship is skipped
+    only if the source already wrote it and none of its nodes was created since,
+    so relationships dropped because a node didn't exist yet, or deleted with a
+    node, are written again. Deletes are computed on `commit`, from what the source
+    wrote last time and not this time.
+    """
+
+    repository: UdelarGraphRepository
+    source: str
+    manifest_path: Path = Path("data/load_manifest.json")
+    stats: Counter = field(default_factory=Counter)
+
+    def __post_init__(self):
+        self.manifest = LoadManifest.load(self.manifest_path)
+        self.generation = self.manifest.generation + 1
+        previous = self.manifest.sources.get(self.source, {})
+        others = [v for k, v in self.manifest.sources.items() if k != self.source]
+        self._previous_generation: int = previous.get("generation", 0)
+        self._previous_hashes: dict[str, dict[str, str]] = {
+            k: previous.get("hashes", {}).get(k, {}) for k in NODE_KINDS
+        }
+        self._previous: dict[str, set] = {
+            k: _keys(previous, k) for k in NODE_KINDS + REL_KINDS
+        }
+        self._others: dict[str, set] = {
+            k: set().union(*(_keys(other, k) for other in others))
+            for k in NODE_KINDS + REL_KINDS
+        }
+        self._seen: dict[str, set] = {k: set() for k in NODE_KINDS + REL_KINDS}
+        self._hashes: dict[str, dict[str, str]] = {k: {} for k in NODE_KINDS}
+        self._written: dict[str, set] = {k: set() for k in REL_KINDS}
+
+    def close(self):
+        self.repository.close()
+
+    def _changed_nodes(
+        self, kind: str, items: list[M], key: Callable[[M], str]
+    ) -> list[M]:
+        nodes = self.manifest.nodes.setdefault(kind, {})
+        previous_hashes = self._previous_hashes[kind]
+        changed = []
+        for item in items:
+            k = key(item)
+            h = content_hash(item)
+            self._seen[kind].add(k)
+            self._hashes[kind][k] = h
+            if k in nodes and previous_hashes.get(k) == h:
+                self.stats[f"{kind} unchanged"] += 1
+                continue
+            nodes.setdefault(k, self.generation)
+            changed.append(item)
+        self.stats[f"{kind} written"] += len(changed)
+        return changed
+
+    def _created_since_last_load(self, kind: str, key: str) -> bool:
+        created = self.manifest.nodes[kind].get(key)
+        return created is not None and created > self._previous_generation
+
+    def _changed_rels(
+        self,
+        kind: str,
+        rels: list[T],
+        key: Callable[[T], tuple[str, str]],
+        start: str,
+        end: str | None = None,
+    ) -> list[T]:
+        changed = []
+        for rel in rels:
+            a, b = key(rel)
+            self._seen[kind].add((a, b))
+            if (a, b) in self._written[kind]:
+                continue
+            touched = self._created_since_last_load(start, a) or (
+                end is not None and self._created_since_last_load(end, b)
+            )
+            if (a, b) in self._previous[kind] and not touched:
+                self.stats[f"{kind} unchanged"] += 1
+                continue
+            self._written[kind].add((a, b))
+            changed.append(rel)
+        self.stats[f"{kind} written"] += len(changed)
+        return changed
+
+    def create_person(self, person: Person):
+        self.create_person_batch([person])
+
+    def create_person_batch(self, persons: list[Person]):
+        self.repository.create_person_batch(
+            self._changed_nodes("Person", persons, lambda p: p.normalized_name)
+        )
+
+    def create_work(self, work: Work):
+        self.create_works_batch([work])
+
+    def update_work(self, work: Work):
+        self.update_works_batch([work])
+
+    def create_works_batch(self, works: list[Work]):
+        self.repository.create_works_batch(
+            self._changed_nodes("Work", works, lambda w: w.normalized_title)
+        )
+
+    def update_works_batch(self, works: list[Work]):
+        self.repository.update_works_batch(
+            self._changed_nodes("Work", works, lambda w: w.normalized_title)
+        )
+
+    def create_work_type(self, work: Work, type: WorkType):
+        self.create_work_type_batch([(work, type)])
+
+    def create_work_type_batch(self, rels: list[tuple[Work, WorkType]]):
+        self.repository.create_work_type_batch(
+            self._changed_rels("TYPE", rels, _work_type_key, "Work")
+        )
+
+    def create_work_keyword(self, work: Work, keyword: WorkKeyword):
+        self.create_work_keyword_batch([(work, keyword)])
+
+    def create_work_keyword_batch(self, rels: list[tuple[Work, WorkKeyword]]):
+        self.repository.create_work_keyword_batch(
+            self._changed_rels("KEYWORD", rels, work_keyword_key, "Work")
+        )
+
+    def create_authorship_relationship(self, person: Person, work: Work):
+        self.create_authorship_relationship_batch([(person, work)])
+
+    def create_contributor_relationship(self, person: Person, work: Work):
+        self.create_contributor_relationship_batch([(person, work)])
+
+    def create_authorship_relationship_batch(self, rels: list[tuple[Person, Work]]):
+        self.repository.create_authorship_relationship_batch(
+            self._changed_rels("AUTHOR_OF", rels, people_to_work_key, "Person", "Work")
+        )
+
+    def create_contributor_relationship_batch(self, rels: list[tuple[Person, Work]]):
+        self.repository.create_contributor_relationship_batch(
+            self._changed_rels(
+                "CONTRIBUTOR_OF", rels, people_to_work_key, "Person", "Work"
+            )
+        )
+
+    def _stale(self, kind: str) -> list:
+        return sorted(self._previous[kind] - self._seen[kind] - self._others[kind])
+
+    def commit(self):
+        """Delete what the source no longer has and save the manifest.
+
+        Nodes and relationships still written by another source are kept.
+        """
+        stale_rels = {kind: self._stale(kind) for kind in REL_KINDS}
+        self.repository.delete_authorship_relationship_batch(
+            [
+                (Person(normalized_name=a), Work(normalized_title=b))
+                for a, b in stale_rels["AUTHOR_OF"]
+            ]
+        )
+        self.repository.delete_contributor_relationship_batch(
+            [
+                (Person(normalized_name=a), Work(normalized_title=b))
+                for a, b in stale_rels["CONTRIBUTOR_OF"]
+            ]
+        )
+        self.repository.delete_work_type_batch(
+            [
+                (Work(normalized_title=a), WorkType(type=b))
+                for a, b in stale_rels["TYPE"]
+            ]
+        )
+        self.repository.delete_work_keyword_batch(
+            [
+                (Work(normalized_title=a), WorkKeyword(keyword=b))
+                for a, b in stale_rels["KEYWORD"]
+            ]
+        )
+
+        stale_people = self._stale("Person")
+        self.repository.delete_person_batch(
+            [Person(normalized_name=k) for k in stale_people]
+        )
+        stale_works = self._stale("Work")
+        self.repository.delete_works_batch(
+            [Work(normalized_title=k) for k in stale_works]
+        )
+
+        for kind, stale in (("Person", stale_people), ("Work", stale_works)):
+            for k in stale:
+                self.manifest.nodes[kind].pop(k, None)
+            self.stats[f"{kind} deleted"] += len(stale)
+        for kind, stale in stale_rels.items():
+            self.stats[f"{kind} deleted"] += len(stale)
+
+        self.manifest.generation = self.generation
+        self.manifest.sources[self.source] = {
+            "generation": self.generation,
+            "hashes": {
+                kind: dict(sorted(h.items())) for kind, h in self._hashes.items()
+            },
+            **{kind: sorted(self._seen[kind]) for kind in REL_KINDS},
+        }
+        self.manifest.save(self.manifest_path)
+        logger.info(
+            f"Incremental load of {self.source}: "
+            + ", ".join(f"{v} {k}" for k, v in sorted(self.stats.items()))
+        )
+
+
+def clear_manifest(manifest_path: Path = Path("data/load_manifest.json")):
+    """Forget every load, to be used when the graph is cleared."""
+    manifest_path.unlink(missing_ok=True)
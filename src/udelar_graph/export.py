@@ -0,0 +1,133 @@
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+
+from udelar_graph.memory_repository import InMemoryGraphRepository, RelType
+from udelar_graph.models import content_hash
+
+ARRAY_DELIMITER = "|"
+
+PERSON_FIELDS = ["names", "surnames", "aliases:string[]"]
+WORK_FIELDS = ["title", "abstract", "type", "pdf_url", "source", "language"]
+
+
+def _write_csv(out_dir: Path, name: str, header: list[str], rows: list[list]):
+    """Write a `<name>_header.csv` file and its `<name>.csv` data file."""
+    with open(out_dir / f"{name}_header.csv", "w", newline="") as f:
+        csv.writer(f, lineterminator="\n").writerow(header)
+    with open(out_dir / f"{name}.csv", "w", newline="") as f:
+        csv.writer(f, lineterminator="\n").writerows(rows)
+
+
+def _join_array(values: list[str]) -> str:
+    """Join the values of an array property. neo4j-admin has no way to escape the
+    delimiter, so values containing it are rejected instead of being split."""
+    for value in values:
+        if ARRAY_DELIMITER in value:
+            raise ValueError(
+                f"{value!r} contains the array delimiter {ARRAY_DELIMITER!r}"
+            )
+    return ARRAY_DELIMITER.join(values)
+
+
+@dataclass
+class ImportFilesWriter(InMemoryGraphRepository):
+    """Collects the graph writes of the loaders and dumps them as files for
+    `neo4j-admin database import`.
+
+    It builds the graph with `InMemoryGraphRepository`, so it can be passed to
+    `populate_graph_colibri` and `load_openalex_works` in place of
+    `UdelarGraphRepository`. Nodes are identified by their merge key, which is also
+    used as the import ID.
+    """
+
+    def write(self, out_dir: Path, database: str = "neo4j") -> str:
+        """Write node and relationship files to `out_dir`.
+
+        Every node label and relationship type gets a header file and a data file.
+        Rows are sorted by ID so the same input always produces the same files.
+
+        Args:
+            out_dir: Directory to write the files to, created if missing
+            database: Name of the database to import into
+
+        Returns:
+            The `neo4j-admin` command that imports the written files.
+
+        Raises:
+            ValueError: If an alias contains `ARRAY_DELIMITER`.
+        """
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        _write_csv(
+            out_dir,
+            "people",
+            ["normalized_name:ID(Person)"] + PERSON_FIELDS + ["content_hash"],
+            [
+                [
+                    k,
+                    p.names,
+                    p.surnames,
+                    _join_array(p.aliases),
+                    content_hash(p),
+                ]
+                for k, p in sorted(self.people.items())
+            ],
+        )
+        _write_csv(
+            out_dir,
+            "works",
+            ["normalized_title:ID(Work)"] + WORK_FIELDS + ["content_hash"],
+            [
+                [k] + [getattr(w, f) for f in WORK_FIELDS] + [content_hash(w)]
+                for k, w in sorted(self.works.items())
+            ],
+        )
+        _write_csv(
+            out_dir,
+            "work_types",
+            ["type:ID(WorkType)"],
+            [[t] for t in sorted(self.work_types)],
+        )
+        _write_csv(
+            out_dir,
+            "keywords",
+            ["keyword:ID(Keyword)"],
+            [[k] for k in sorted(self.keywords)],
+        )
+
+        id_spaces: dict[RelType, tuple[str, str]] = {
+            "AUTHOR_OF": ("Person", "Work"),
+            "CONTRIBUTOR_OF": ("Person", "Work"),
+            "TYPE": ("Work", "WorkType"),
+            "KEYWORD": ("Work", "Keyword"),
+        }
+        for rel, (start, end) in id_spaces.items():
+            _write_csv(
+                out_dir,
+                rel.lower(),
+                [f":START_ID({start})", f":END_ID({end})"],
+                [list(r) for r in sorted(self.relationships(rel))],
+            )
+
+        nodes = {
+            "Person": "people",
+            "Work": "works",
+            "WorkType": "work_types",
+            "Keyword": "keywords",
+        }
+        args = [f"neo4j-admin database import full {database}"]
+        for label, name in nodes.items():
+            args.append(
+                f"--nodes={label}={out_dir / name}_header.csv,{out_dir / name}.csv"
+            )
+        for rel in id_spaces:
+            name = rel.lower()
+            args.append(
+                f"--relationships={rel}={out_dir / name}_header.csv,"
+                f"{out_dir / name}.csv"
+            )
+        args.append(f"--array-delimiter='{ARRAY_DELIMITER}'")
+        args.append("--multiline-fields=true")
+        args.append("--overwrite-destination=true")
+        return " \\\n    ".join(args)
@@ -9,14 +9,28 @@ from tqdm import tqdm
 from tqdm.asyncio import tqdm as tqdm_async
 from unidecode import unidecode
 
+from udelar_graph.async_repository import AsyncUdelarGraphRepository
+from udelar_graph.datasets import (
+    DATASETS_DIR,
+    scan_dataset,
+    source_fingerprint,
+    write_dataset,
+)
 from udelar_graph.models import Person, Work, WorkKeyword, WorkType
+from udelar_graph.processing.name_extraction import (
+    ExtractedNames,
+    ExtractedNamesDB,
+    ExtractedNamesJournal,
+    NameExtractionService,
+)
 from udelar_graph.processing.names import (
+    ParsedNameStore,
     StructuredNameResponse,
-    extract_person_name,
     get_people_list,
 )
-from udelar_graph.processing.works import normalize_work_name
-from udelar_graph.repository import UdelarGraphRepository
+from udelar_graph.processing.normalization import fold_accents, normalize_titles
+from udelar_graph.profiling import stage
+from udelar_graph.repository import GraphRepository
 
 
 def load_colibri_data(data_dir: Path = Path("data/colibri")) -> pl.DataFrame:
@@ -32,11 +46,7 @@ def load_colibri_data(data_dir: Path = Path("data/colibri")) -> pl.DataFrame:
     all_paths = data_dir.glob("**/*.jsonl")
     data = []
     for path in all_paths:
-        if "Facultad de Ingeniería" not in str(path) or not (
-            "Eléctrica" in str(path)
-            or "Mecánica" in str(path)
-            or "Computación" in str(path)
-        ):
+        if not _is_loaded_department(str(path)):
             continue
         with open(path, "r") as f:
             for line in f:
@@ -45,6 +55,53 @@ def load_colibri_data(data_dir: Path = Path("data/colibri")) -> pl.DataFrame:
     return pl.DataFrame(data)
 
 
+def _is_loaded_department(path: str) -> bool:
+    return "Facultad de Ingeniería" in path and (
+        "Eléctrica" in path or "Mecánica" in path or "Computación" in path
+    )
+
+
+def ingest_colibri(
+    data_dir: Path = Path("data/colibri"), dataset_dir: Path = DATASETS_DIR
+) -> int:
+    """
+    Converts every Colibri JSONL file in `data_dir` to a Parquet dataset partitioned
+    by faculty, with the `normalized_title` column already computed.
+
+    The rows keep the file they were read from, so `prepare_colibri_data` selects
+    the same departments and the same order as `load_colibri_data`.
+
+    Returns:
+        int: Number of works written.
+    """
+    data = []
+    for path in data_dir.glob("**/*.jsonl"):
+        faculty = path.relative_to(data_dir).parts[0]
+        with open(path, "r") as f:
+            for line in f:
+                row = json.loads(line)
+                row["source_path"] = str(path)
+                row["faculty"] = faculty
+                data.append(row)
+
+    df = (
+        pl.DataFrame(data, infer_schema_length=None)
+        .with_columns(
+            normalized_title=normalize_titles(pl.col("title")),
+        )
+        .with_row_index("row_index")
+    )
+    write_dataset(
+        df,
+        "colibri",
+        source=data_dir,
+        fingerprint=source_fingerprint(data_dir, "**/*.jsonl"),
+        partition_by="faculty",
+        dataset_dir=dataset_dir,
+    )
+    return len(df)
+
+
 def get_works(data: pl.DataFrame) -> list[Work]:
     """
     Extracts a list of Work objects from the provided DataFrame.
@@ -100,9 +157,7 @@ def get_person_to_work_relations(
         for row in (
             data.select(
                 pl.col(rel).alias("person"),
-                pl.col("title")
-                .map_elements(normalize_work_name, return_dtype=pl.String)
-                .alias("normalized_title"),
+                pl.col("normalized_title"),
             )
             .explode("person")
             .with_columns(
@@ -155,11 +210,9 @@ def get_work_keywords(
         )
         .explode("keyword")
         .with_columns(
-            keyword=pl.col("keyword")
-            .str.strip_chars()
-            .replace(".", "")
-            .map_elements(unidecode, return_dtype=pl.String)
-            .str.to_lowercase()
+            keyword=fold_accents(
+                pl.col("keyword").str.strip_chars().replace(".", "")
+            ).str.to_lowercase()
         )
     )
     if excluded_keyworks:
@@ -175,34 +228,116 @@ def get_work_keywords(
     ]
 
 
-def populate_graph_colibri(
-    repository: UdelarGraphRepository,
-    data_dir: Path = Path("data/colibri"),
-    *,
-    extract_missing_names: bool = False,
-):
+def load_colibri_outputs(
+    people_json: Path = Path("data/colibri_people.json"),
+    works_json: Path = Path("data/colibri_works.json"),
+) -> tuple[list[Person], list[Work]]:
     """
-    Populates the graph database with Colibri data, including people, works, relationships, types, and keywords.
-    Optionally extracts missing names using an external service.
+    Loads the people and works saved by `populate_graph_colibri`.
 
     Args:
-        repository (UdelarGraphRepository): The repository to populate.
-        data_dir (Path, optional): Directory containing Colibri data. Defaults to 'data/colibri'.
-        extract_missing_names (bool, optional): Whether to extract missing names using OpenAI. Defaults to False.
+        people_json (Path): File with the list of loaded people.
+        works_json (Path): File with the loaded works, keyed by normalized title.
+
+    Returns:
+        tuple[list[Person], list[Work]]: The loaded people and works.
     """
-    data = load_colibri_data(data_dir)
-    data = data.with_columns(
-        normalized_title=pl.col("title").map_elements(
-            normalize_work_name, return_dtype=pl.String
-        ),
-    )
+    with open(people_json, "r") as f:
+        people = [Person.model_validate(p) for p in json.load(f)]
+    with open(works_json, "r") as f:
+        works = [Work.model_validate(w) for w in json.load(f).values()]
+    return people, works
+
+
+EXTRACTED_NAMES_PATH = Path("data/extracted_names.sqlite")
 
-    people, people_name_mapping = get_people_list(data)
-    with open("data/extracted_names.json", "r") as f:
-        extracted_names: dict[str, StructuredNameResponse] = {
+
+def read_extracted_names(
+    path: Path = Path("data/extracted_names.json"),
+) -> dict[str, StructuredNameResponse]:
+    """
+    Reads the names already extracted with OpenAI, keyed by normalized name.
+
+    The names in the journal next to `path` (same name, `.jsonl` suffix) are
+    included, so the progress of an interrupted extraction isn't lost.
+
+    Args:
+        path (Path, optional): JSON file with the extracted names.
+
+    Returns:
+        dict[str, StructuredNameResponse]: The extracted names.
+    """
+    with open(path, "r") as f:
+        extracted_names = {
             k: StructuredNameResponse.model_validate(v) for k, v in json.load(f).items()
         }
+    extracted_names.update(ExtractedNamesJournal(path.with_suffix(".jsonl")).read())
+    return extracted_names
+
+
+def open_extracted_names(path: Path = EXTRACTED_NAMES_PATH) -> ExtractedNames:
+    """
+    Opens the extracted names, from the SQLite store if `path` has a `.sqlite` or
+    `.db` suffix, or reading the whole JSON file otherwise.
 
+    If the SQLite store doesn't exist yet but the JSON file next to it (same name,
+    `.json` suffix) does, the JSON names are migrated to the store first.
+
+    Args:
+        path (Path, optional): SQLite store or JSON file with the extracted names.
+
+    Returns:
+        ExtractedNames: The extracted names, keyed by normalized name.
+    """
+    if path.suffix not in (".sqlite", ".db"):
+        return read_extracted_names(path)
+
+    json_path = path.with_suffix(".json")
+    if not path.exists() and json_path.exists():
+        count = migrate_extracted_names(json_path, path)
+        logger.info(f"Migrated {count} extracted names from {json_path} to {path}")
+    elif json_path.exists() and json_path.stat().st_mtime > path.stat().st_mtime:
+        logger.warning(
+            f"{json_path} is newer than {path}, run `udegraph extracted-names-migrate` "
+            "to copy its names"
+        )
+    return ExtractedNamesDB(path)
+
+
+def migrate_extracted_names(json_path: Path, db_path: Path) -> int:
+    """
+    Copies the names of the JSON file, and of its journal, to the SQLite store.
+
+    Args:
+        json_path (Path): JSON file with the extracted names.
+        db_path (Path): SQLite store, created if it doesn't exist.
+
+    Returns:
+        int: Number of names copied.
+    """
+    extracted_names = read_extracted_names(json_path)
+    db = ExtractedNamesDB(db_path)
+    try:
+        db.update(extracted_names)
+    finally:
+        db.close()
+    return len(extracted_names)
+
+
+def apply_extracted_names(
+    people: list[Person], extracted_names: ExtractedNames
+) -> tuple[list[Person], set[str]]:
+    """
+    Sets the names and surnames of each person from the already extracted names.
+
+    Args:
+        people (list[Person]): People to update in place.
+        extracted_names (ExtractedNames): Extracted names.
+
+    Returns:
+        tuple[list[Person], set[str]]: People without an extracted name and the
+            normalized names of the entries that are not a person.
+    """
     missing_people = []
     filter_people = set()
     for person in tqdm(people):
@@ -220,31 +355,104 @@ def populate_graph_colibri(
 
     if len(missing_people) > 0:
         logger.info(f"{len(missing_people)} missing names")
-    if extract_missing_names:
-        logger.info("Extracting with openai")
-        async_pbar = tqdm_async(total=len(missing_people), desc="Extracting names")
-        tasks = [
-            extract_person_name(person, pbar=async_pbar) for person in missing_people
-        ]
-        event_loop = asyncio.get_event_loop()
-        extracted_missing_names = event_loop.run_until_complete(asyncio.gather(*tasks))
-        for person, extracted_name in zip(missing_people, extracted_missing_names):
+    return missing_people, filter_people
+
+
+async def extract_missing_people_names(
+    missing_people: list[Person],
+    extracted_names: ExtractedNames,
+    path: Path = Path("data/extracted_names.json"),
+    service: NameExtractionService | None = None,
+):
+    """
+    Extracts the names of the missing people with OpenAI, updating them in place,
+    and saves the new names to the extracted names file.
+
+    With the SQLite store each name is saved to it as soon as it arrives. With the
+    JSON file each name is appended to the journal next to `path` as soon as it
+    arrives, and the whole file is rewritten at the end, after which the journal is
+    removed.
+
+    Args:
+        missing_people (list[Person]): People without an extracted name.
+        extracted_names (ExtractedNames): Extracted names, the new ones are added to
+            it.
+        path (Path, optional): JSON file with the extracted names, not used with
+            the SQLite store.
+        service (NameExtractionService, optional): Service used for the requests,
+            by default one with its default limits.
+    """
+    logger.info("Extracting with openai")
+    in_db = isinstance(extracted_names, ExtractedNamesDB)
+    journal = ExtractedNamesJournal(path.with_suffix(".jsonl"))
+    own_service = service is None
+    if service is None:
+        service = NameExtractionService()
+    async_pbar = tqdm_async(total=len(missing_people), desc="Extracting names")
+    try:
+        async for person, extracted_name in service.extract_people(
+            missing_people, pbar=async_pbar
+        ):
             if extracted_name is not None:
                 person.names = extracted_name.first_names
                 person.surnames = extracted_name.surnames
                 extracted_names[person.normalized_name] = extracted_name
+                if not in_db:
+                    journal.append(person.normalized_name, extracted_name)
             else:
                 logger.warning(f"Failed to extract name for {person.normalized_name}")
+    finally:
         async_pbar.close()
+        if own_service:
+            await service.close()
+
+    if in_db:
+        return
+    with open(path, "w") as f:
+        logger.info("Saving extracted names")
+        json.dump(
+            {k: v.model_dump(mode="json") for k, v in extracted_names.items()},
+            f,
+            indent=4,
+        )
+    # the journal names were read into `extracted_names` and are now in the file
+    journal.clear()
 
-        with open("data/extracted_names.json", "w") as f:
-            logger.info("Saving extracted names")
-            json.dump(
-                {k: v.model_dump(mode="json") for k, v in extracted_names.items()},
-                f,
-                indent=4,
-            )
 
+async def _extract_missing_people_names_and_close(
+    missing_people: list[Person],
+    extracted_names: ExtractedNames,
+    path: Path,
+    service: NameExtractionService | None,
+):
+    """Runs `extract_missing_people_names` and closes `service` on the same event
+    loop, since its client can't be used on another one."""
+    async with service if service is not None else NameExtractionService() as service:
+        await extract_missing_people_names(
+            missing_people, extracted_names, path, service=service
+        )
+
+
+def join_people(
+    people: list[Person],
+    people_name_mapping: dict[str, str],
+    filter_people: set[str],
+) -> list[Person]:
+    """
+    Drops the filtered people and the ones without names, renames the rest from
+    their extracted names and joins the people that end up with the same name.
+
+    Args:
+        people (list[Person]): People with their extracted names.
+        people_name_mapping (dict[str, str]): Mapping from original to normalized
+            person names, updated in place: every alias of a renamed person points
+            to its new normalized name. Aliases of dropped people keep their old
+            name, which no longer matches a person.
+        filter_people (set[str]): Normalized names of the entries to drop.
+
+    Returns:
+        list[Person]: The final list of people.
+    """
     logger.info(f"Filtering {len(filter_people)} people")
     if len(filter_people) > 0:
         logger.info(f"Filtering {len(filter_people)} people")
@@ -255,9 +463,9 @@ def populate_graph_colibri(
     final_people_list: list[Person] = []
     index = 0
     new_normalized_names_mapping: dict[str, int] = {}
-    reversed_people_name_mapping: dict[str, str] = {
-        v: k for k, v in people_name_mapping.items()
-    }
+    reversed_people_name_mapping: dict[str, list[str]] = {}
+    for k, v in people_name_mapping.items():
+        reversed_people_name_mapping.setdefault(v, []).append(k)
     for person in people:
         if person.names is None or person.surnames is None:
             continue
@@ -270,9 +478,8 @@ def populate_graph_colibri(
             .replace("_", " ")
         )
 
-        people_name_mapping[reversed_people_name_mapping[old_normalized_name]] = (
-            person.normalized_name
-        )
+        for alias in reversed_people_name_mapping[old_normalized_name]:
+            people_name_mapping[alias] = person.normalized_name
 
         if person.normalized_name not in new_normalized_names_mapping:
             new_normalized_names_mapping[person.normalized_name] = index
@@ -283,46 +490,301 @@ def populate_graph_colibri(
                 new_normalized_names_mapping[person.normalized_name]
             ].aliases.extend(person.aliases)
 
-    people = final_people_list
-    logger.info(f"Final number of people: {len(people)}")
+    logger.info(f"Final number of people: {len(final_people_list)}")
+    return final_people_list
+
+
+def prepare_colibri_data(
+    data_dir: Path = Path("data/colibri"), dataset_dir: Path = DATASETS_DIR
+) -> pl.DataFrame:
+    """
+    Loads the Colibri data and adds the `normalized_title` column.
+
+    The Parquet dataset written by `udegraph ingest` is read instead of the JSONL
+    files if they didn't change since.
+
+    Args:
+        data_dir (Path, optional): Directory containing Colibri data.
+        dataset_dir (Path, optional): Directory of the Parquet datasets.
+
+    Returns:
+        pl.DataFrame: The Colibri data.
+    """
+    dataset = scan_dataset(
+        "colibri",
+        source=data_dir,
+        fingerprint=source_fingerprint(data_dir, "**/*.jsonl"),
+        dataset_dir=dataset_dir,
+    )
+    if dataset is not None:
+        source_path = pl.col("source_path")
+        return (
+            dataset.filter(
+                source_path.str.contains("Facultad de Ingeniería", literal=True)
+                & (
+                    source_path.str.contains("Eléctrica", literal=True)
+                    | source_path.str.contains("Mecánica", literal=True)
+                    | source_path.str.contains("Computación", literal=True)
+                )
+            )
+            .sort("row_index")
+            .drop("row_index", "source_path", "faculty")
+            .collect()
+        )
+
+    data = load_colibri_data(data_dir)
+    return data.with_columns(
+        normalized_title=normalize_titles(pl.col("title")),
+    )
+
 
-    with open("data/colibri_people.json", "w") as f:
+def save_people(people: list[Person], path: Path = Path("data/colibri_people.json")):
+    with open(path, "w") as f:
         json.dump([p.model_dump(mode="json") for p in people], f, indent=4)
 
-    works = get_works(data)
-    with open("data/colibri_works.json", "w") as f:
+
+def save_works(works: list[Work], path: Path = Path("data/colibri_works.json")):
+    with open(path, "w") as f:
         json.dump(
             {w.normalized_title: w.model_dump(mode="json") for w in works},
             f,
             indent=4,
         )
 
-    authorship_relations = get_person_to_work_relations(
-        data, "authors", people_name_mapping
-    )
-    contributor_relations = get_person_to_work_relations(
-        data, "contributors", people_name_mapping
-    )
 
-    work_types = get_work_types(data)
-    work_types_string = set({wt[1].type for wt in work_types})
-    work_keywords = get_work_keywords(data, work_types_string)
+def _get_people_list(
+    data: pl.DataFrame, name_workers: int, parsed_names_path: Path | None
+) -> tuple[list[Person], dict[str, str]]:
+    if parsed_names_path is None:
+        return get_people_list(data, workers=name_workers)
+
+    store = ParsedNameStore.load(parsed_names_path)
+    cached = len(store)
+    result = get_people_list(data, workers=name_workers, store=store)
+    if len(store) > cached:
+        logger.info(f"Caching {len(store) - cached} new parsed names")
+        store.save(parsed_names_path)
+    return result
+
+
+def populate_graph_colibri(
+    repository: GraphRepository,
+    data_dir: Path = Path("data/colibri"),
+    *,
+    extract_missing_names: bool = False,
+    extracted_names_path: Path = EXTRACTED_NAMES_PATH,
+    output_dir: Path = Path("data"),
+    name_workers: int = 1,
+    parsed_names_path: Path | None = None,
+    name_extraction: NameExtractionService | None = None,
+):
+    """
+    Populates the graph database with Colibri data, including people, works, relationships, types, and keywords.
+    Optionally extracts missing names using an external service.
+
+    Args:
+        repository (GraphRepository): The repository to populate, on Neo4j or in memory.
+        data_dir (Path, optional): Directory containing Colibri data. Defaults to 'data/colibri'.
+        extract_missing_names (bool, optional): Whether to extract missing names using OpenAI. Defaults to False.
+        extracted_names_path (Path, optional): SQLite store (`.sqlite` or `.db`),
+            by default 'data/extracted_names.sqlite', or JSON file with the
+            extracted names.
+        output_dir (Path, optional): Directory where the loaded people and works
+            are saved for the OpenAlex load. Defaults to 'data'.
+        name_workers (int, optional): Number of processes used to compare names.
+        parsed_names_path (Path, optional): JSON file where the parsed names are
+            cached between runs. Names are parsed on every run if not given.
+        name_extraction (NameExtractionService, optional): Service used to extract
+            the missing names, by default one with its default limits. It is
+            closed once the names are extracted.
+    """
+    with stage("colibri.read") as s:
+        data = prepare_colibri_data(data_dir)
+        s.rows = len(data)
+
+    with stage("colibri.group_names") as s:
+        people, people_name_mapping = _get_people_list(
+            data, name_workers, parsed_names_path
+        )
+        s.rows = len(people_name_mapping)
+
+    with stage("colibri.resolve_names", rows=len(people)):
+        extracted_names = open_extracted_names(extracted_names_path)
+        missing_people, filter_people = apply_extracted_names(people, extracted_names)
+        if extract_missing_names:
+            asyncio.run(
+                _extract_missing_people_names_and_close(
+                    missing_people,
+                    extracted_names,
+                    extracted_names_path,
+                    name_extraction,
+                )
+            )
+        if isinstance(extracted_names, ExtractedNamesDB):
+            extracted_names.close()
+
+        people = join_people(people, people_name_mapping, filter_people)
+        save_people(people, output_dir / "colibri_people.json")
+
+    with stage("colibri.build_graph", rows=len(data)):
+        works = get_works(data)
+        save_works(works, output_dir / "colibri_works.json")
+
+        authorship_relations = get_person_to_work_relations(
+            data, "authors", people_name_mapping
+        )
+        contributor_relations = get_person_to_work_relations(
+            data, "contributors", people_name_mapping
+        )
+
+        work_types = get_work_types(data)
+        work_types_string = set({wt[1].type for wt in work_types})
+        work_keywords = get_work_keywords(data, work_types_string)
 
     logger.info(f"Creating {len(people)} people")
-    repository.create_person_batch(people)
+    with stage("colibri.write_people", rows=len(people)):
+        repository.create_person_batch(people)
     logger.info(f"Creating {len(works)} works")
-    repository.create_works_batch(works)
+    with stage("colibri.write_works", rows=len(works)):
+        repository.create_works_batch(works)
     logger.info(f"Creating {len(authorship_relations)} authorship relations")
-    repository.create_authorship_relationship_batch(authorship_relations)
+    with stage("colibri.write_authorships", rows=len(authorship_relations)):
+        repository.create_authorship_relationship_batch(authorship_relations)
     logger.info(f"Creating {len(contributor_relations)} contributor relations")
-    repository.create_contributor_relationship_batch(contributor_relations)
+    with stage("colibri.write_contributions", rows=len(contributor_relations)):
+        repository.create_contributor_relationship_batch(contributor_relations)
     logger.info(
         f"Creating {len(work_types_string)} work types and {len(work_types)} "
         "WorkType relations"
     )
-    repository.create_work_type_batch(work_types)
+    with stage("colibri.write_work_types", rows=len(work_types)):
+        repository.create_work_type_batch(work_types)
     logger.info(
         f"Creating {len(set(wk[1].keyword for wk in work_keywords))} work keywords and "
         f"{len(work_keywords)} WorkKeyword relations"
     )
-    repository.create_work_keyword_batch(work_keywords)
+    with stage("colibri.write_keywords", rows=len(work_keywords)):
+        repository.create_work_keyword_batch(work_keywords)
+
+
+async def _write_works_async(
+    repository: AsyncUdelarGraphRepository,
+    works: list[Work],
+    work_types: list[tuple[Work, WorkType]],
+    work_keywords: list[tuple[Work, WorkKeyword]],
+):
+    logger.info(f"Creating {len(works)} works")
+    with stage("colibri.write_works", rows=len(works)):
+        await repository.create_works_batch(works)
+    logger.info(f"Creating {len(work_types)} WorkType relations")
+    with stage("colibri.write_work_types", rows=len(work_types)):
+        await repository.create_work_type_batch(work_types)
+    logger.info(f"Creating {len(work_keywords)} WorkKeyword relations")
+    with stage("colibri.write_keywords", rows=len(work_keywords)):
+        await repository.create_work_keyword_batch(work_keywords)
+
+
+async def populate_graph_colibri_async(
+    repository: AsyncUdelarGraphRepository,
+    data_dir: Path = Path("data/colibri"),
+    *,
+    extract_missing_names: bool = False,
+    extracted_names_path: Path = EXTRACTED_NAMES_PATH,
+    output_dir: Path = Path("data"),
+    name_workers: int = 1,
+    parsed_names_path: Path | None = None,
+    name_extraction: NameExtractionService | None = None,
+):
+    """
+    Async version of `populate_graph_colibri`.
+
+    Works, types and keywords don't depend on the people names, so they are
+    written while the names are grouped and the missing ones extracted. People and
+    their relationships are written once the names are resolved. If the load
+    fails, the works still being written are cancelled. The stages are recorded
+    like in `populate_graph_colibri`, the works ones overlapping the names ones.
+
+    Args:
+        repository (AsyncUdelarGraphRepository): The repository to populate.
+        data_dir (Path, optional): Directory containing Colibri data.
+        extract_missing_names (bool, optional): Whether to extract missing names
+            using OpenAI. Defaults to False.
+        extracted_names_path (Path, optional): SQLite store (`.sqlite` or `.db`),
+            by default 'data/extracted_names.sqlite', or JSON file with the
+            extracted names.
+        output_dir (Path, optional): Directory where the loaded people and works
+            are saved for the OpenAlex load. Defaults to 'data'.
+        name_workers (int, optional): Number of processes used to compare names.
+        parsed_names_path (Path, optional): JSON file where the parsed names are
+            cached between runs. Names are parsed on every run if not given.
+        name_extraction (NameExtractionService, optional): Service used to extract
+            the missing names, by default one with its default limits.
+    """
+    with stage("colibri.read") as s:
+        data = prepare_colibri_data(data_dir)
+        s.rows = len(data)
+
+    with stage("colibri.build_works", rows=len(data)):
+        works = get_works(data)
+        save_works(works, output_dir / "colibri_works.json")
+        work_types = get_work_types(data)
+        work_types_string = set({wt[1].type for wt in work_types})
+        work_keywords = get_work_keywords(data, work_types_string)
+    works_written = asyncio.create_task(
+        _write_works_async(repository, works, work_types, work_keywords)
+    )
+
+    try:
+        with stage("colibri.group_names") as s:
+            # grouping is CPU bound, run it in a thread so the works are written
+            # meanwhile
+            people, people_name_mapping = await asyncio.to_thread(
+                _get_people_list, data, name_workers, parsed_names_path
+            )
+            s.rows = len(people_name_mapping)
+
+        with stage("colibri.resolve_names", rows=len(people)):
+            extracted_names = open_extracted_names(extracted_names_path)
+            missing_people, filter_people = apply_extracted_names(
+                people, extracted_names
+            )
+            if extract_missing_names:
+                await extract_missing_people_names(
+                    missing_people,
+                    extracted_names,
+                    extracted_names_path,
+                    service=name_extraction,
+                )
+            if isinstance(extracted_names, ExtractedNamesDB):
+                extracted_names.close()
+
+            people = join_people(people, people_name_mapping, filter_people)
+            save_people(people, output_dir / "colibri_people.json")
+
+        with stage("colibri.build_graph", rows=len(data)):
+            authorship_relations = get_person_to_work_relations(
+                data, "authors", people_name_mapping
+            )
+            contributor_relations = get_person_to_work_relations(
+                data, "contributors", people_name_mapping
+            )
+
+        logger.info(f"Creating {len(people)} people")
+        with stage("colibri.write_people", rows=len(people)):
+            await repository.create_person_batch(people)
+        with stage("colibri.wait_works", rows=len(works)):
+            await works_written
+        logger.info(f"Creating {len(authorship_relations)} authorship relations")
+        with stage("colibri.write_authorships", rows=len(authorship_relations)):
+            await repository.create_authorship_relationship_batch(authorship_relations)
+        logger.info(f"Creating {len(contributor_relations)} contributor relations")
+        with stage("colibri.write_contributions", rows=len(contributor_relations)):
+            await repository.create_contributor_relationship_batch(
+                contributor_relations
+            )
+    finally:
+        # don't leave the works being written if the load failed, and retrieve
+        # their result so a failure isn't reported as never retrieved
+        if not works_written.done():
+            works_written.cancel()
+        await asyncio.gather(works_written, return_exceptions=True)
@@ -1,22 +1,142 @@
 import re
+from pathlib import Path
 
 import numpy as np
 import polars as pl
-from Levenshtein import distance
 from loguru import logger
 from sklearn.feature_extraction.text import CountVectorizer
 from tqdm import tqdm
 from unidecode import unidecode
 
+from udelar_graph.datasets import (
+    DATASETS_DIR,
+    scan_dataset,
+    source_fingerprint,
+    write_dataset,
+)
 from udelar_graph.models import Person, Work, WorkKeyword, WorkType
-from udelar_graph.processing.works import normalize_work_name
-from udelar_graph.repository import UdelarGraphRepository
+from udelar_graph.processing.normalization import fold_accents, normalize_titles
+from udelar_graph.processing.works import TitleIndex
+from udelar_graph.profiling import stage
+from udelar_graph.repository import GraphRepository
+
+# Columns of the OpenAlex works export used by `load_openalex_works`
+OPENALEX_SCHEMA = {
+    "title": pl.String,
+    "abstract": pl.String,
+    "language": pl.String,
+    "type": pl.String,
+    "primary_location.landing_page_url": pl.String,
+    "keywords.display_name": pl.String,
+    "authorships.author.display_name": pl.String,
+}
+
+
+# Columns of the OpenAlex works after `prepare_openalex_works`
+OPENALEX_COLUMNS = [
+    "title",
+    "abstract",
+    "language",
+    "type",
+    "primary_location.landing_page_url",
+    "authors",
+    "authors_normalized",
+    "keywords",
+]
+
+
+def _scan_openalex_csv(path: Path) -> pl.LazyFrame:
+    return (
+        pl.scan_csv(path, infer_schema=False, schema_overrides=OPENALEX_SCHEMA)
+        .select(OPENALEX_SCHEMA.keys())
+        .filter(
+            pl.col("title").is_not_null()
+            & pl.col("authorships.author.display_name").is_not_null()
+        )
+    )
+
+
+def scan_openalex_works(path: Path, dataset_dir: Path = DATASETS_DIR) -> pl.LazyFrame:
+    """
+    Scans an OpenAlex works CSV export without reading it.
+
+    If `udegraph ingest` converted the file and it didn't change since, the Parquet
+    dataset is scanned instead. Otherwise every column is read as a string, so the
+    file isn't read to infer the types, and only the columns of `OPENALEX_SCHEMA`
+    are kept. Pass the result to `load_openalex_works` to read the file once,
+    streaming, with the rows without title or authors skipped while reading.
+    """
+    dataset = scan_dataset(
+        "openalex",
+        source=path,
+        fingerprint=source_fingerprint(path),
+        dataset_dir=dataset_dir,
+    )
+    if dataset is not None:
+        return dataset.sort("row_index").drop("row_index")
+    return _scan_openalex_csv(path)
+
+
+def prepare_openalex_works(data: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Splits the authors and keywords of the OpenAlex works in lists and normalizes
+    the author names, unless they already are, keeping the `OPENALEX_COLUMNS`.
+    """
+    columns = data.collect_schema().names()
+    if "authors" not in columns:
+        data = data.with_columns(
+            authors=pl.col("authorships.author.display_name").str.split("|"),
+            keywords=pl.col("keywords.display_name").str.split("|"),
+        )
+    if "authors_normalized" not in columns:
+        data = data.with_columns(
+            authors_normalized=fold_accents(
+                pl.col("authors").list.eval(pl.element().str.to_lowercase()),
+                pl.List(pl.String),
+            ).list.eval(pl.element().replace(".", ""))
+        )
+    return data.select(OPENALEX_COLUMNS)
+
+
+def ingest_openalex(path: Path, dataset_dir: Path = DATASETS_DIR) -> int:
+    """
+    Converts an OpenAlex works CSV export to a Parquet dataset partitioned by work
+    type, with the authors and keywords already split and normalized. The rows keep
+    their position in the file, so the works are loaded in the same order.
+
+    Returns:
+        int: Number of works written.
+    """
+    data = (
+        prepare_openalex_works(_scan_openalex_csv(path))
+        .with_row_index("row_index")
+        .collect(engine="streaming")
+    )
+    write_dataset(
+        data,
+        "openalex",
+        source=path,
+        fingerprint=source_fingerprint(path),
+        partition_by="type",
+        dataset_dir=dataset_dir,
+    )
+    return len(data)
 
 
 def get_openalex_to_colibri_authors_mapping(
     data: pl.DataFrame,
     existing_people: list[Person],
+    chunk_size: int = 4096,
 ):
+    """
+    Maps each OpenAlex author name to the Colibri person with the same words.
+
+    The names are compared as binary bags of words, scored by the number of shared
+    words. A name is mapped when every one of its words matches its best Colibri
+    people and exactly one of them has a number of names within 2 of the query.
+    The scores of `chunk_size` OpenAlex names are computed with a single sparse
+    product and filtered on arrays.
+    """
     if "authors_normalized" not in data.columns:
         raise ValueError("Missing `normalize_author` column on input dataframe.")
     openalex_authors = (
@@ -41,45 +161,54 @@ def get_openalex_to_colibri_authors_mapping(
         .replace("-", " ")
         for c_author in existing_people
     ]
-    colibri_names_lenghts = [
-        len(c_author.names.split(" ") + c_author.surnames.split(" "))
-        for c_author in existing_people
-    ]
+    colibri_names_lenghts = np.array(
+        [
+            len(c_author.names.split(" ") + c_author.surnames.split(" "))
+            for c_author in existing_people
+        ]
+    )
     colibri_vectors = vectorizer.fit_transform(colibri_texts)
-    openalex_names = openalex_authors["authors_normalized"].unique().to_list()
+    openalex_names = [
+        oa_author
+        for oa_author in openalex_authors["authors_normalized"].unique().to_list()
+        if len(oa_author.split(" ")) >= 2
+    ]
+    queries = [
+        unidecode(oa_author.lower().replace(".", "")) for oa_author in openalex_names
+    ]
+    query_words = np.array([len(query.split(" ")) for query in queries])
+    query_lengths = np.array([len(re.split(r"[- ]", query)) for query in queries])
 
     openalex_to_colibri_author_mapping = {}
-    for oa_author in tqdm(
-        openalex_names,
-        total=len(openalex_names),
+    for start in tqdm(
+        range(0, len(queries), chunk_size),
         desc="Mapping OpenAlex authors to Colibri",
     ):
-        if len(oa_author.split(" ")) < 2:
-            continue
-        query = unidecode(oa_author.lower().replace(".", ""))
-        col_vector = vectorizer.transform([query])
-
-        scores = col_vector @ colibri_vectors.T
-        max_score = scores.max()
-        if max_score == 0:
-            continue
-
-        best_match = np.argmax(scores)
-        if max_score != len(query.split(" ")):
-            matches = np.nonzero(scores == max_score)[1]
-            continue
-
-        matches = np.nonzero(scores == max_score)[1]
-        close_matches = []
-        for match in matches:
-            if abs(len(re.split(r"[- ]", query)) - colibri_names_lenghts[match]) > 2:
-                continue
-            close_matches.append(match)
-        if len(close_matches) != 1:
-            continue
-
-        best_match = close_matches[0]
-        openalex_to_colibri_author_mapping[oa_author] = existing_people[best_match]
+        stop = min(start + chunk_size, len(queries))
+        scores = (vectorizer.transform(queries[start:stop]) @ colibri_vectors.T).tocsr()
+        scores.eliminate_zeros()
+        max_scores = scores.max(axis=1).toarray().ravel()
+
+        # score of each stored entry, with its query (row) and Colibri person
+        rows = np.repeat(np.arange(stop - start), np.diff(scores.indptr))
+        cols = scores.indices
+        is_best = scores.data == max_scores[rows]
+        # every word of the query must match, and only one best match can have a
+        # number of names close to the query
+        close = is_best & (
+            np.abs(query_lengths[start + rows] - colibri_names_lenghts[cols]) <= 2
+        )
+        close_count = np.bincount(rows[close], minlength=stop - start)
+        unique = (
+            (max_scores > 0)
+            & (max_scores == query_words[start:stop])
+            & (close_count == 1)
+        )
+        for row, col in zip(rows[close].tolist(), cols[close].tolist()):
+            if unique[row]:
+                openalex_to_colibri_author_mapping[openalex_names[start + row]] = (
+                    existing_people[col]
+                )
 
     return openalex_to_colibri_author_mapping
 
@@ -89,7 +218,12 @@ def find_repeated_works(
 ) -> dict[str, str]:
     if "normalized_title" not in data.columns:
         raise ValueError("Missing `normalized_title` column on dataframe")
-    openalex_works = set(data["normalized_title"].unique().drop_nulls().to_list())
+    openalex_titles = (
+        data["normalized_title"].unique(maintain_order=True).drop_nulls().to_list()
+    )
+    openalex_works = set(openalex_titles)
+    # titles at distance < 5 of an existing one
+    title_index = TitleIndex(openalex_titles, max_distance=4)
     repeated_works: dict[str, str] = {}
     for existing_work in tqdm(
         existing_works,
@@ -103,38 +237,98 @@ def find_repeated_works(
         if len(existing_work.normalized_title) < 20:
             continue
 
-        for w in openalex_works:
-            if distance(existing_work.normalized_title, w) < 5:
-                repeated_works[w] = existing_work.normalized_title
+        for w in title_index.search(existing_work.normalized_title):
+            repeated_works[w] = existing_work.normalized_title
 
     return repeated_works
 
 
+# Work fields filled from OpenAlex when the existing work doesn't have them
+ENRICHED_WORK_FIELDS = ("abstract", "pdf_url", "language", "type")
+
+
 def get_openalex_works(
     data: pl.DataFrame, existing_works: list[Work]
 ) -> tuple[pl.DataFrame, list[Work], list[Work]]:
+    """
+    Splits the OpenAlex works in the ones already loaded and the new ones.
+
+    The fields of `ENRICHED_WORK_FIELDS` missing from an existing work are filled,
+    in place, from the first OpenAlex row of its repeated titles, with a single join
+    between both sets of works. When several OpenAlex titles repeat the same work
+    each field comes from the first one that has it, in the order of
+    `find_repeated_works`.
+
+    Returns:
+        tuple[pl.DataFrame, list[Work], list[Work]]: `data` with the repeated titles
+            renamed to the existing ones, the existing works that were updated,
+            once for each repeated title that added a field, and the new works.
+    """
     repeated_works = find_repeated_works(data, existing_works)
+
+    existing_by_title: dict[str, Work] = {}
+    for work in existing_works:
+        existing_by_title.setdefault(work.normalized_title, work)
+
+    fields = list(ENRICHED_WORK_FIELDS)
+    schema = {"existing_title": pl.String, **{f: pl.String for f in fields}}
+    existing_data = pl.DataFrame(
+        [
+            (title, *(getattr(existing_by_title[title], f) for f in fields))
+            for title in dict.fromkeys(repeated_works.values())
+        ],
+        schema=schema,
+        orient="row",
+    )
+    repeated = (
+        pl.DataFrame(
+            {
+                "normalized_title": list(repeated_works.keys()),
+                "existing_title": list(repeated_works.values()),
+            },
+            schema={"normalized_title": pl.String, "existing_title": pl.String},
+        )
+        .with_row_index("order")
+        .join(
+            data.unique("normalized_title", keep="first", maintain_order=True).select(
+                "normalized_title", *(pl.col(f).alias(f"{f}_openalex") for f in fields)
+            ),
+            on="normalized_title",
+            how="left",
+        )
+        .join(existing_data, on="existing_title", how="left")
+        .sort("order")
+        .with_columns(
+            # a repeated title updates a field if it's the first one that has it
+            # and the existing work doesn't
+            pl.any_horizontal(
+                pl.col(f).is_null()
+                & pl.col(f"{f}_openalex").is_not_null()
+                & (
+                    pl.col(f"{f}_openalex")
+                    .is_not_null()
+                    .cum_sum()
+                    .over("existing_title")
+                    == 1
+                )
+                for f in fields
+            ).alias("updated"),
+            *(
+                pl.coalesce(
+                    f,
+                    pl.col(f"{f}_openalex").drop_nulls().first().over("existing_title"),
+                )
+                for f in fields
+            ),
+        )
+    )
+
     updated_works = []
-    for k, v in repeated_works.items():
-        updated = False
-        openalex_data = data.filter(pl.col("normalized_title") == k).to_dicts()[0]
-        colibri_data = list(filter(lambda x: x.normalized_title == v, existing_works))[
-            0
-        ]
-        if colibri_data.abstract is None and openalex_data["abstract"] is not None:
-            colibri_data.abstract = openalex_data["abstract"]
-            updated = True
-        if colibri_data.pdf_url is None and openalex_data["pdf_url"] is not None:
-            colibri_data.pdf_url = openalex_data["pdf_url"]
-            updated = True
-        if colibri_data.language is None and openalex_data["language"] is not None:
-            colibri_data.language = openalex_data["language"]
-            updated = True
-        if colibri_data.type is None and openalex_data["type"] is not None:
-            colibri_data.type = openalex_data["type"]
-            updated = True
-        if updated:
-            updated_works.append(colibri_data)
+    for row in repeated.filter("updated").iter_rows(named=True):
+        work = existing_by_title[row["existing_title"]]
+        for f in fields:
+            setattr(work, f, row[f])
+        updated_works.append(work)
 
     new_works = [
         Work(
@@ -150,9 +344,7 @@ def get_openalex_works(
     ]
 
     data = data.with_columns(
-        normalized_title=pl.col("normalized_title").map_elements(
-            lambda x: repeated_works.get(x, x), return_dtype=pl.String
-        )
+        normalized_title=pl.col("normalized_title").replace(repeated_works)
     )
 
     return data, updated_works, new_works
@@ -173,10 +365,12 @@ def get_person_to_work_edges(
         )
         .explode("authors_normalized")
         .with_columns(
-            authors_normalized=pl.col("authors_normalized").map_elements(
-                lambda x: oa_to_existing_people_mapping[x].normalized_name
-                if x in oa_to_existing_people_mapping
-                else None,
+            authors_normalized=pl.col("authors_normalized").replace_strict(
+                {
+                    name: person.normalized_name
+                    for name, person in oa_to_existing_people_mapping.items()
+                },
+                default=None,
                 return_dtype=pl.String,
             )
         )
@@ -215,25 +409,32 @@ def get_work_types(
 
 
 def load_openalex_works(
-    data: pl.DataFrame,
-    repository: UdelarGraphRepository,
+    data: pl.DataFrame | pl.LazyFrame,
+    repository: GraphRepository,
     *,
     existing_people: list[Person] = [],
     existing_works: list[Work] = [],
 ):
-    data = data.with_columns(
-        authors=pl.col("authorships.author.display_name").str.split("|")
-    ).with_columns(
-        authors_normalized=pl.col("authors").list.eval(
-            pl.element()
-            .str.to_lowercase()
-            .map_elements(unidecode, return_dtype=pl.String)
-            .replace(".", "")
+    """
+    Loads the OpenAlex works that have authors in Colibri, merging the repeated
+    works with the existing ones.
+
+    Args:
+        data (pl.DataFrame | pl.LazyFrame): OpenAlex works, for instance from
+            `scan_openalex_works`. A `LazyFrame` is collected with the streaming
+            engine, only reading the columns it needs.
+        repository (GraphRepository): The repository to write to.
+        existing_people (list[Person], optional): People loaded from Colibri.
+        existing_works (list[Work], optional): Works loaded from Colibri.
+    """
+    with stage("openalex.normalize_authors") as s:
+        data = prepare_openalex_works(data.lazy()).collect(engine="streaming")
+        s.rows = len(data)
+    with stage("openalex.author_mapping") as s:
+        oa_to_existing_mapping = get_openalex_to_colibri_authors_mapping(
+            data, existing_people
         )
-    )
-    oa_to_existing_mapping = get_openalex_to_colibri_authors_mapping(
-        data, existing_people
-    )
+        s.rows = len(oa_to_existing_mapping)
 
     # keep articles with at least 2 existing authors
     data = data.filter(
@@ -243,38 +444,43 @@ def load_openalex_works(
         > 0
     )
 
-    openalex_works = data.select(
-        pl.col("title"),
-        pl.col("title")
-        .map_elements(normalize_work_name, return_dtype=pl.String)
-        .alias("normalized_title"),
-        pl.col("abstract"),
-        pl.col("authors"),
-        pl.col("authors_normalized"),
-        pl.col("language"),
-        pl.col("type"),
-        pl.col("primary_location.landing_page_url").alias("pdf_url"),
-        pl.col("keywords.display_name").str.split("|").alias("keywords"),
-    ).filter(pl.col("normalized_title").is_not_null())
-
-    openalex_works, updated_works, new_works = get_openalex_works(
-        openalex_works, existing_works
-    )
+    with stage("openalex.works", rows=len(data)):
+        openalex_works = data.select(
+            pl.col("title"),
+            normalize_titles(pl.col("title")).alias("normalized_title"),
+            pl.col("abstract"),
+            pl.col("authors"),
+            pl.col("authors_normalized"),
+            pl.col("language"),
+            pl.col("type"),
+            pl.col("primary_location.landing_page_url").alias("pdf_url"),
+            pl.col("keywords"),
+        ).filter(pl.col("normalized_title").is_not_null())
+
+        openalex_works, updated_works, new_works = get_openalex_works(
+            openalex_works, existing_works
+        )
 
-    author_to_work_edges = get_person_to_work_edges(
-        openalex_works, oa_to_existing_mapping
-    )
+    with stage("openalex.build_graph", rows=len(openalex_works)):
+        author_to_work_edges = get_person_to_work_edges(
+            openalex_works, oa_to_existing_mapping
+        )
 
-    work_keywords = get_work_keywords(openalex_works)
-    work_types = get_work_types(openalex_works)
+        work_keywords = get_work_keywords(openalex_works)
+        work_types = get_work_types(openalex_works)
 
     logger.info(f"Updating {len(updated_works)} works")
-    repository.update_works_batch(updated_works)
+    with stage("openalex.write_updated_works", rows=len(updated_works)):
+        repository.update_works_batch(updated_works)
     logger.info(f"Creating {len(new_works)} works")
-    repository.create_works_batch(new_works)
+    with stage("openalex.write_works", rows=len(new_works)):
+        repository.create_works_batch(new_works)
     logger.info(f"Creating {len(author_to_work_edges)} authorship relationships")
-    repository.create_authorship_relationship_batch(author_to_work_edges)
+    with stage("openalex.write_authorships", rows=len(author_to_work_edges)):
+        repository.create_authorship_relationship_batch(author_to_work_edges)
     logger.info(f"Creating {len(work_keywords)} work keywords")
-    repository.create_work_keyword_batch(work_keywords)
+    with stage("openalex.write_keywords", rows=len(work_keywords)):
+        repository.create_work_keyword_batch(work_keywords)
     logger.info(f"Creating {len(work_types)} work types connections")
-    repository.create_work_type_batch(work_types)
+    with stage("openalex.write_work_types", rows=len(work_types)):
+        repository.create_work_type_batch(work_types)
@@ -0,0 +1,177 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterator, Literal
+
+from udelar_graph.models import Person, Work, WorkKeyword, WorkType
+from udelar_graph.repository import PeopleToWorkRel
+
+RelType = Literal["AUTHOR_OF", "CONTRIBUTOR_OF", "TYPE", "KEYWORD"]
+REL_TYPES: tuple[RelType, ...] = ("AUTHOR_OF", "CONTRIBUTOR_OF", "TYPE", "KEYWORD")
+
+
+def _adjacency() -> dict[str, dict[str, set[str]]]:
+    return {rel: defaultdict(set) for rel in REL_TYPES}
+
+
+@dataclass
+class InMemoryGraphRepository:
+    """Graph kept in dictionaries, with the same write methods as
+    `UdelarGraphRepository`.
+
+    Nodes are stored by their merge key and relationships as adjacency sets, from
+    the start node key to the end node keys and back, by relationship type. Writes
+    follow the Neo4j semantics: a node upsert replaces the stored properties and a
+    relationship is dropped if its `Person` or `Work` doesn't exist. Used to run the
+    loaders without a database.
+    """
+
+    people: dict[str, Person] = field(default_factory=dict)
+    works: dict[str, Work] = field(default_factory=dict)
+    work_types: set[str] = field(default_factory=set)
+    keywords: set[str] = field(default_factory=set)
+    out_edges: dict[str, dict[str, set[str]]] = field(default_factory=_adjacency)
+    in_edges: dict[str, dict[str, set[str]]] = field(default_factory=_adjacency)
+
+    def close(self):
+        """Nothing to close, kept for compatibility with `UdelarGraphRepository`."""
+
+    def _add_edge(self, rel: RelType, start: str, end: str):
+        self.out_edges[rel][start].add(end)
+        self.in_edges[rel][end].add(start)
+
+    def _remove_edge(self, rel: RelType, start: str, end: str):
+        self.out_edges[rel][start].discard(end)
+        self.in_edges[rel][end].discard(start)
+
+    def _detach(
+        self, key: str, outgoing: tuple[RelType, ...], incoming: tuple[RelType, ...]
+    ):
+        for rel in outgoing:
+            for end in self.out_edges[rel].pop(key, set()):
+                self.in_edges[rel][end].discard(key)
+        for rel in incoming:
+            for start in self.in_edges[rel].pop(key, set()):
+                self.out_edges[rel][start].discard(key)
+
+    def _delete_orphan_terms(self):
+        self.work_types = {t for t in self.work_types if self.in_edges["TYPE"].get(t)}
+        self.keywords = {k for k in self.keywords if self.in_edges["KEYWORD"].get(k)}
+
+    def relationships(self, rel: RelType) -> Iterator[tuple[str, str]]:
+        """Keys of the start and end nodes of every `rel` relationship."""
+        for start, ends in self.out_edges[rel].items():
+            for end in ends:
+                yield start, end
+
+    def summary(self) -> dict[str, int]:
+        """Number of nodes by label and of relationships by type."""
+        return {
+            "Person": len(self.people),
+            "Work": len(self.works),
+            "WorkType": len(self.work_types),
+            "Keyword": len(self.keywords),
+            **{
+                rel: sum(len(ends) for ends in self.out_edges[rel].values())
+                for rel in REL_TYPES
+            },
+        }
+
+    def create_person(self, person: Person):
+        self.create_person_batch([person])
+
+    def create_person_batch(self, persons: list[Person]):
+        for p in persons:
+            self.people[p.normalized_name] = p.model_copy(deep=True)
+
+    def dedupe_people(self) -> int:
+        """People are keyed by `normalized_name`, so there are never duplicates."""
+        return 0
+
+    def create_work(self, work: Work):
+        self.create_works_batch([work])
+
+    def update_work(self, work: Work):
+        self.create_works_batch([work])
+
+    def create_works_batch(self, works: list[Work]):
+        for w in works:
+            self.works[w.normalized_title] = w.model_copy()
+
+    def update_works_batch(self, works: list[Work]):
+        self.create_works_batch(works)
+
+    def create_work_type(self, work: Work, type: WorkType):
+        self.create_work_type_batch([(work, type)])
+
+    def create_work_type_batch(self, rels: list[tuple[Work, WorkType]]):
+        for w, t in rels:
+            if w.normalized_title not in self.works:
+                continue
+            self.work_types.add(t.type)
+            self._add_edge("TYPE", w.normalized_title, t.type)
+
+    def create_work_keyword(self, work: Work, keyword: WorkKeyword):
+        self.create_work_keyword_batch([(work, keyword)])
+
+    def create_work_keyword_batch(self, rels: list[tuple[Work, WorkKeyword]]):
+        for w, k in rels:
+            if w.normalized_title not in self.works:
+                continue
+            self.keywords.add(k.keyword)
+            self._add_edge("KEYWORD", w.normalized_title, k.keyword)
+
+    def _create_people_to_work_batch(
+        self, rels: list[tuple[Person, Work]], rel: PeopleToWorkRel
+    ):
+        for p, w in rels:
+            if p.normalized_name not in self.people:
+                continue
+            if w.normalized_title not in self.works:
+                continue
+            self._add_edge(rel, p.normalized_name, w.normalized_title)
+
+    def create_authorship_relationship(self, person: Person, work: Work):
+        self._create_people_to_work_batch([(person, work)], "AUTHOR_OF")
+
+    def create_contributor_relationship(self, person: Person, work: Work):
+        self._create_people_to_work_batch([(person, work)], "CONTRIBUTOR_OF")
+
+    def create_authorship_relationship_batch(self, rels: list[tuple[Person, Work]]):
+        self._create_people_to_work_batch(rels, "AUTHOR_OF")
+
+    def create_contributor_relationship_batch(self, rels: list[tuple[Person, Work]]):
+        self._create_people_to_work_batch(rels, "CONTRIBUTOR_OF")
+
+    def delete_person_batch(self, persons: list[Person]):
+        for p in persons:
+            if self.people.pop(p.normalized_name, None) is not None:
+                self._detach(p.normalized_name, ("AUTHOR_OF", "CONTRIBUTOR_OF"), ())
+
+    def delete_works_batch(self, works: list[Work]):
+        for w in works:
+            if self.works.pop(w.normalized_title, None) is not None:
+                self._detach(
+                    w.normalized_title,
+                    ("TYPE", "KEYWORD"),
+                    ("AUTHOR_OF", "CONTRIBUTOR_OF"),
+                )
+
+    def delete_work_type_batch(self, rels: list[tuple[Work, WorkType]]):
+        for w, t in rels:
+            self._remove_edge("TYPE", w.normalized_title, t.type)
+        if rels:
+            self._delete_orphan_terms()
+
+    def delete_work_keyword_batch(self, rels: list[tuple[Work, WorkKeyword]]):
+        for w, k in rels:
+            self._remove_edge("KEYWORD", w.normalized_title, k.keyword)
+        if rels:
+            self._delete_orphan_terms()
+
+    def delete_authorship_relationship_batch(self, rels: list[tuple[Person, Work]]):
+        for p, w in rels:
+            self._remove_edge("AUTHOR_OF", p.normalized_name, w.normalized_title)
+
+    def delete_contributor_relationship_batch(self, rels: list[tuple[Person, Work]]):
+        for p, w in rels:
+            self._remove_edge("CONTRIBUTOR_OF", p.normalized_name, w.normalized_title)
@@ -1,3 +1,6 @@
+import hashlib
+import json
+
 from pydantic import BaseModel, Field
 
 
@@ -24,3 +27,12 @@ class WorkType(BaseModel):
 
 class WorkKeyword(BaseModel):
     keyword: str
+
+
+def content_hash(model: BaseModel) -> str:
+    """Hash of the model fields, independent of the order of list fields."""
+    data = {
+        k: sorted(v) if isinstance(v, list) else v
+        for k, v in model.model_dump(mode="json").items()
+    }
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
@@ -0,0 +1,473 @@
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from dataclasses import InitVar, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Mapping
+
+import openai
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+from tqdm import tqdm
+
+from udelar_graph.models import Person
+from udelar_graph.processing.names import StructuredNameResponse, parse_name_locally
+
+NAME_EXTRACTION_PROMPT = """\
+You are an expert extracting people names from unstructured text. \
+You'll be given a name in any format and will return a json object with the following \
+format.  If there is extra information on the text, like the institution, the \
+position, etc, you should return it in the "institution" and "department" fields. \
+The names are mostly in spanish and can appear in any order.
+
+{
+    "surnames": "string",
+    "first_names": "string",
+    "institution": "string" | None,
+    "department": "string" | None,
+    "person": bool # True if the text is a person name, False otherwise.
+}
+
+If the text is not a person name, return None.
+"""
+
+BATCH_NAME_EXTRACTION_PROMPT = """\
+You are an expert extracting people names from unstructured text. \
+You'll be given a json list of objects with an "index" and a "text" with a name in \
+any format, and will return a json object with one item per input object, with the \
+same index, in the following format. If there is extra information on the text, like \
+the institution, the position, etc, you should return it in the "institution" and \
+"department" fields. The names are mostly in spanish and can appear in any order.
+
+{
+    "names": [
+        {
+            "index": int,
+            "surnames": "string",
+            "first_names": "string",
+            "institution": "string" | None,
+            "department": "string" | None,
+            "person": bool # True if the text is a person name, False otherwise.
+        }
+    ]
+}
+"""
+
+
+class BatchedNameResponse(StructuredNameResponse):
+    index: int
+
+
+class BatchedNamesResponse(BaseModel):
+    names: list[BatchedNameResponse]
+
+
+# Errors worth retrying, the rest (bad request, authentication, ...) fail the
+# same way on every attempt
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+@dataclass
+class TokenBucket:
+    """Rate limiter allowing `rate` acquisitions per second on average, with bursts
+    of up to `capacity`."""
+
+    rate: float
+    capacity: float = 1.0
+    _tokens: float = field(init=False, repr=False)
+    _updated: float = field(init=False, repr=False)
+    _lock: asyncio.Lock = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class ExtractedNamesJournal:
+    """Append-only JSONL file with the names extracted so far, one per line.
+
+    Every result is written as soon as it arrives, so an interrupted extraction
+    keeps its progress. A line cut by a crash is ignored when reading, and the
+    last line of a name wins.
+    """
+
+    path: Path
+
+    def read(self) -> dict[str, StructuredNameResponse]:
+        extracted_names: dict[str, StructuredNameResponse] = {}
+        if not self.path.exists():
+            return extracted_names
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping truncated line of {self.path}")
+                    continue
+                extracted_names[entry["name"]] = StructuredNameResponse.model_validate(
+                    entry["extracted"]
+                )
+        return extracted_names
+
+    def append(self, name: str, extracted_name: StructuredNameResponse):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(
+                json.dumps(
+                    {"name": name, "extracted": extracted_name.model_dump(mode="json")},
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+            f.flush()
+
+    def clear(self):
+        """Remove the journal, once its names are saved elsewhere."""
+        self.path.unlink(missing_ok=True)
+
+
+class ExtractedNamesDB:
+    """SQLite table of extracted names, keyed by normalized name.
+
+    Lookups only read the requested row and build the `StructuredNameResponse`
+    without validating it again, so opening the store doesn't depend on its size.
+    Every assignment is committed on its own, so an interrupted extraction keeps
+    its progress. Supports the `dict` operations used by the loaders.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS extracted_names ("
+            "name TEXT PRIMARY KEY, surnames TEXT NOT NULL, first_names TEXT NOT NULL, "
+            "institution TEXT, department TEXT, person INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+    @staticmethod
+    def _row(name: str, extracted_name: StructuredNameResponse) -> tuple:
+        return (
+            name,
+            extracted_name.surnames,
+            extracted_name.first_names,
+            extracted_name.institution,
+            extracted_name.department,
+            extracted_name.person,
+        )
+
+    @staticmethod
+    def _response(row: tuple) -> StructuredNameResponse:
+        surnames, first_names, institution, department, person = row
+        return StructuredNameResponse.model_construct(
+            surnames=surnames,
+            first_names=first_names,
+            institution=institution,
+            department=department,
+            person=bool(person),
+        )
+
+    def get(
+        self, name: str, default: StructuredNameResponse | None = None
+    ) -> StructuredNameResponse | None:
+        row = self._connection.execute(
+            "SELECT surnames, first_names, institution, department, person "
+            "FROM extracted_names WHERE name = ?",
+            (name,),
+        ).fetchone()
+        return self._response(row) if row is not None else default
+
+    def __getitem__(self, name: str) -> StructuredNameResponse:
+        extracted_name = self.get(name)
+        if extracted_name is None:
+            raise KeyError(name)
+        return extracted_name
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __len__(self) -> int:
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM extracted_names"
+        ).fetchone()[0]
+
+    def __setitem__(self, name: str, extracted_name: StructuredNameResponse):
+        self.update({name: extracted_name})
+
+    def update(self, extracted_names: Mapping[str, StructuredNameResponse]):
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO extracted_names VALUES (?, ?, ?, ?, ?, ?)",
+                (self._row(k, v) for k, v in extracted_names.items()),
+            )
+
+    def items(self) -> Iterator[tuple[str, StructuredNameResponse]]:
+        for name, *row in self._connection.execute(
+            "SELECT name, surnames, first_names, institution, department, person "
+            "FROM extracted_names ORDER BY name"
+        ):
+            yield name, self._response(tuple(row))
+
+
+# Extracted names as read from the JSON file or from the SQLite store
+ExtractedNames = dict[str, StructuredNameResponse] | ExtractedNamesDB
+
+
+@dataclass
+class NameExtractionService:
+    """Extracts people names with OpenAI over a single shared client.
+
+    At most `max_concurrency` requests are in flight and they are started at
+    `requests_per_second` on average. Rate limits, connection and server errors are
+    retried up to `max_retries` times with exponential backoff and jitter. Set
+    `base_url` to point the client to another OpenAI-compatible server, like a local
+    stub.
+
+    With `batch_size > 1` the aliases are sent `batch_size` at a time, in a single
+    request with a list response. The aliases of a batch that fails, or that are
+    missing from its response, are extracted again one by one.
+
+    People whose alias `parse_name_locally` parses with a confidence of at least
+    `local_confidence` are resolved without a request. Set it above 1 to send
+    every alias to OpenAI.
+
+    The client is bound to the event loop of its first request, so use the service
+    as an async context manager within that loop to close it there.
+    """
+
+    model: str = "gpt-4o-mini"
+    base_url: str | None = None
+    max_concurrency: int = 8
+    requests_per_second: float = 5.0
+    max_retries: int = 5
+    backoff: float = 1.0
+    batch_size: int = 1
+    local_confidence: float = 0.9
+    client: InitVar[openai.AsyncOpenAI | None] = None
+    _client: openai.AsyncOpenAI = field(init=False, repr=False)
+    _semaphore: asyncio.Semaphore = field(init=False, repr=False)
+    _bucket: TokenBucket = field(init=False, repr=False)
+
+    def __post_init__(self, client: openai.AsyncOpenAI | None):
+        if client is None:
+            # retries are handled here, so they share the rate limiter
+            client = openai.AsyncOpenAI(base_url=self.base_url, max_retries=0)
+        self._client = client
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket = TokenBucket(
+            self.requests_per_second, capacity=max(1.0, self.requests_per_second)
+        )
+
+    async def close(self):
+        await self._client.close()
+
+    async def __aenter__(self) -> "NameExtractionService":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _request(self, alias: str) -> StructuredNameResponse | None:
+        response = await self._client.responses.parse(
+            model=self.model,
+            temperature=0.0,
+            input=[
+                {"role": "system", "content": NAME_EXTRACTION_PROMPT},
+                {"role": "user", "content": alias},
+            ],
+            text_format=StructuredNameResponse,
+        )
+        return response.output_parsed
+
+    async def _request_batch(self, aliases: list[str]) -> BatchedNamesResponse | None:
+        response = await self._client.responses.parse(
+            model=self.model,
+            temperature=0.0,
+            input=[
+                {"role": "system", "content": BATCH_NAME_EXTRACTION_PROMPT},
+                {
+                    "role": "user",
+                    "content": json.dumps(
+                        [{"index": i, "text": a} for i, a in enumerate(aliases)],
+                        ensure_ascii=False,
+                    ),
+                },
+            ],
+            text_format=BatchedNamesResponse,
+        )
+        return response.output_parsed
+
+    async def _with_retries(
+        self, request: Callable[..., Awaitable[Any]], arg: Any, description: str
+    ) -> Any | None:
+        """Run `request(arg)` within the concurrency and rate limits, retrying the
+        retryable errors. Returns None if it still fails."""
+        async with self._semaphore:
+            for attempt in range(1, self.max_retries + 1):
+                await self._bucket.acquire()
+                try:
+                    return await request(arg)
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.max_retries:
+                        logger.warning(f"Failed to extract {description}: {e}")
+                        return None
+                    delay = self.backoff * 2 ** (attempt - 1) * random.uniform(1, 2)
+                    logger.debug(
+                        f"Extraction of {description} failed ({e}), retrying in "
+                        f"{delay:.1f}s ({attempt}/{self.max_retries})"
+                    )
+                    await asyncio.sleep(delay)
+                except (openai.OpenAIError, ValidationError) as e:
+                    logger.warning(f"Failed to extract {description}: {e}")
+                    return None
+        return None
+
+    async def extract(self, alias: str) -> StructuredNameResponse | None:
+        """Extract the name written in `alias`.
+
+        Returns:
+            StructuredNameResponse | None: The name, or None if the request failed
+                after every retry or returned no name.
+        """
+        return await self._with_retries(self._request, alias, repr(alias))
+
+    async def extract_batch(
+        self, aliases: list[str]
+    ) -> list[StructuredNameResponse | None]:
+        """Extract the names written in `aliases` with a single request.
+
+        Every item of the response is validated as a `StructuredNameResponse`. The
+        aliases without a valid item, or all of them if the request fails, are
+        extracted with `extract`.
+
+        Returns:
+            list[StructuredNameResponse | None]: The name of each alias, in order.
+        """
+        results: list[StructuredNameResponse | None] = [None] * len(aliases)
+        response = await self._with_retries(
+            self._request_batch, aliases, f"a batch of {len(aliases)} names"
+        )
+        found = set()
+        for item in response.names if response is not None else []:
+            if not 0 <= item.index < len(aliases) or item.index in found:
+                continue
+            try:
+                results[item.index] = StructuredNameResponse.model_validate(
+                    item.model_dump(exclude={"index"})
+                )
+                found.add(item.index)
+            except ValidationError:
+                continue
+
+        missing = [i for i in range(len(aliases)) if i not in found]
+        if missing:
+            logger.debug(f"Extracting {len(missing)} names of a batch one by one")
+            for i, extracted_name in zip(
+                missing,
+                await asyncio.gather(*(self.extract(aliases[i]) for i in missing)),
+            ):
+                results[i] = extracted_name
+        return results
+
+    async def extract_person(
+        self, person: Person
+    ) -> tuple[Person, StructuredNameResponse | None]:
+        """Extract the name of `person` from its longest alias."""
+        longest_alias = _longest_alias(person)
+        if not longest_alias:
+            return person, None
+        extracted_name = self.extract_locally(longest_alias)
+        if extracted_name is not None:
+            return person, extracted_name
+        return person, await self.extract(longest_alias)
+
+    def extract_locally(self, alias: str) -> StructuredNameResponse | None:
+        """The name of `alias` from `parse_name_locally`, if it is confident
+        enough."""
+        extracted_name, confidence = parse_name_locally(alias)
+        if confidence < self.local_confidence:
+            return None
+        return extracted_name
+
+    async def _extract_people_batch(
+        self, batch: list[tuple[Person, str]]
+    ) -> list[tuple[Person, StructuredNameResponse | None]]:
+        """Extract the names of people paired with their longest alias."""
+        aliases = [alias for _, alias in batch]
+        if len(aliases) == 1:
+            extracted_names = [await self.extract(aliases[0])]
+        else:
+            extracted_names = await self.extract_batch(aliases)
+        return [(person, name) for (person, _), name in zip(batch, extracted_names)]
+
+    async def extract_people(
+        self, people: list[Person], *, pbar: tqdm | None = None
+    ) -> AsyncIterator[tuple[Person, StructuredNameResponse | None]]:
+        """Extract the names of `people`, yielding each one as soon as it arrives,
+        not in the order of `people`. People are sent in batches of `batch_size`,
+        the ones resolved locally are yielded first."""
+        local = {}
+        for person in people:
+            alias = _longest_alias(person)
+            if alias:
+                extracted_name = self.extract_locally(alias)
+                if extracted_name is not None:
+                    local[id(person)] = extracted_name
+        if local:
+            logger.info(f"{len(local)} names parsed locally")
+
+        with_alias = [
+            (person, alias)
+            for person in people
+            if (alias := _longest_alias(person)) and id(person) not in local
+        ]
+        size = max(self.batch_size, 1)
+        tasks = [
+            asyncio.ensure_future(self._extract_people_batch(with_alias[i : i + size]))
+            for i in range(0, len(with_alias), size)
+        ]
+        try:
+            for person in people:
+                if not _longest_alias(person) or id(person) in local:
+                    if pbar is not None:
+                        pbar.update(1)
+                    yield person, local.get(id(person))
+            for task in asyncio.as_completed(tasks):
+                for result in await task:
+                    if pbar is not None:
+                        pbar.update(1)
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def _longest_alias(person: Person) -> str | None:
+    return max(person.aliases, key=len) if person.aliases else None
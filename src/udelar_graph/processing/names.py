@@ -1,12 +1,25 @@
-import openai
+import json
+import re
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Sequence
+
+import numpy as np
 import polars as pl
 from Levenshtein import distance
 from pydantic import BaseModel
+from rapidfuzz.distance import Levenshtein
+from rapidfuzz.process import cdist, cpdist
 from tqdm import tqdm
 from unidecode import unidecode
 
 from udelar_graph.models import Person
 
+if TYPE_CHECKING:
+    from udelar_graph.processing.name_extraction import NameExtractionService
+
 
 def parse_full_name(name: str) -> dict | None:
     """Parse a full name into surnames and first names"""
@@ -39,6 +52,185 @@ def parse_full_name(name: str) -> dict | None:
     }
 
 
+class ParsedNameStore:
+    """
+    The `parse_full_name` result of many names, computed once and shared by the
+    name functions.
+
+    Instead of a dict per name, the normalized tokens are interned in a single
+    `vocabulary` and each name keeps the ids of its surname and first name tokens
+    in flat arrays, with the offset where the tokens of every name start. Names are
+    identified by the position in which they were added, see `id`.
+
+    The store can be saved to and loaded from a JSON file keyed by the raw names,
+    so the names of previous runs aren't parsed again.
+    """
+
+    def __init__(self):
+        self.index: dict[str, int] = {}
+        self.vocabulary: list[str] = []
+        self._token_ids: dict[str, int] = {}
+        self.surnames: list[str] = []
+        self.first_names: list[str] = []
+        self.parsed = array("b")
+        self._surname_tokens = array("i")
+        self._surname_starts = array("q", [0])
+        self._first_name_tokens = array("i")
+        self._first_name_starts = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def _intern(self, normalized: str, tokens: array, starts: array):
+        for token in normalized.split("_"):
+            token_id = self._token_ids.get(token)
+            if token_id is None:
+                token_id = self._token_ids[token] = len(self.vocabulary)
+                self.vocabulary.append(token)
+            tokens.append(token_id)
+        starts.append(len(tokens))
+
+    def _append(self, name: str, parsed: dict | None):
+        self.index[name] = len(self.index)
+        self.parsed.append(parsed is not None)
+        if parsed is None:
+            self.surnames.append("")
+            self.first_names.append("")
+            self._surname_starts.append(len(self._surname_tokens))
+            self._first_name_starts.append(len(self._first_name_tokens))
+            return
+
+        self.surnames.append(parsed["surnames"])
+        self.first_names.append(parsed["first_names"])
+        self._intern(
+            parsed["surnames_normalized"], self._surname_tokens, self._surname_starts
+        )
+        self._intern(
+            parsed["first_names_normalized"],
+            self._first_name_tokens,
+            self._first_name_starts,
+        )
+
+    def add(self, names: Iterable[str]) -> int:
+        """Parse the names that aren't in the store yet.
+
+        Returns:
+            int: Number of names added.
+        """
+        added = 0
+        for name in names:
+            if name not in self.index:
+                self._append(name, parse_full_name(name))
+                added += 1
+        return added
+
+    def id(self, name: str) -> int:
+        """Position of `name` in the store, it must have been added."""
+        return self.index[name]
+
+    def ids(self, names: Iterable[str]) -> np.ndarray:
+        return np.array([self.index[name] for name in names], dtype=np.int64)
+
+    def is_parsed(self, i: int) -> bool:
+        return bool(self.parsed[i])
+
+    def surnames_parts(self, i: int) -> list[str]:
+        start, stop = self._surname_starts[i], self._surname_starts[i + 1]
+        return [self.vocabulary[t] for t in self._surname_tokens[start:stop]]
+
+    def first_names_parts(self, i: int) -> list[str]:
+        start, stop = self._first_name_starts[i], self._first_name_starts[i + 1]
+        return [self.vocabulary[t] for t in self._first_name_tokens[start:stop]]
+
+    def normalized_name(self, i: int) -> str:
+        """Normalized first names and surnames, the key of a `Person`."""
+        return (
+            "_".join(self.first_names_parts(i)) + "_" + "_".join(self.surnames_parts(i))
+        )
+
+    def get(self, name: str) -> dict | None:
+        """Same result as `parse_full_name(name)`, for a name in the store."""
+        i = self.id(name)
+        if not self.parsed[i]:
+            return None
+        surnames_parts = self.surnames_parts(i)
+        first_names_parts = self.first_names_parts(i)
+        return {
+            "surnames": self.surnames[i],
+            "first_names": self.first_names[i],
+            "surnames_normalized": "_".join(surnames_parts),
+            "first_names_normalized": "_".join(first_names_parts),
+            "surnames_parts": surnames_parts,
+            "first_names_parts": first_names_parts,
+        }
+
+    def _padded(self, tokens: array, starts: array, ids: np.ndarray) -> np.ndarray:
+        starts_array = np.frombuffer(starts, dtype=np.int64)
+        first = starts_array[ids]
+        lengths = starts_array[ids + 1] - first
+        positions = np.arange(max(lengths.max(initial=0), 1))
+        mask = positions[None, :] < lengths[:, None]
+        padded = np.full(mask.shape, -1, dtype=np.int64)
+        padded[mask] = np.frombuffer(tokens, dtype=np.int32)[
+            (first[:, None] + positions[None, :])[mask]
+        ]
+        return padded
+
+    def surname_ids(self, ids: np.ndarray) -> np.ndarray:
+        """Surname token ids of the names `ids`, padded with -1 to at least one
+        column."""
+        return self._padded(self._surname_tokens, self._surname_starts, ids)
+
+    def first_name_ids(self, ids: np.ndarray) -> np.ndarray:
+        """First name token ids of the names `ids`, padded with -1 to at least one
+        column."""
+        return self._padded(self._first_name_tokens, self._first_name_starts, ids)
+
+    def save(self, path: Path):
+        """Write the store as JSON, from each raw name to its surnames, first names
+        and their normalized versions, or null if it can't be parsed."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    name: [
+                        self.surnames[i],
+                        self.first_names[i],
+                        "_".join(self.surnames_parts(i)),
+                        "_".join(self.first_names_parts(i)),
+                    ]
+                    if self.parsed[i]
+                    else None
+                    for name, i in self.index.items()
+                },
+                f,
+                ensure_ascii=False,
+            )
+
+    @classmethod
+    def load(cls, path: Path) -> "ParsedNameStore":
+        """Read a store written by `save`, or an empty one if `path` doesn't
+        exist."""
+        store = cls()
+        if not path.exists():
+            return store
+        with open(path, "r") as f:
+            for name, parsed in json.load(f).items():
+                if parsed is not None:
+                    surnames, first_names, surnames_norm, first_names_norm = parsed
+                    parsed = {
+                        "surnames": surnames,
+                        "first_names": first_names,
+                        "surnames_normalized": surnames_norm,
+                        "first_names_normalized": first_names_norm,
+                    }
+                store._append(name, parsed)
+        return store
+
+
 def are_surnames_same(
     surnames1_parts: list, surnames2_parts: list, threshold: int = 2
 ) -> bool:
@@ -141,51 +333,123 @@ def are_first_names_same(
     ) and _check_names_match(first2_parts, first1_parts, threshold)
 
 
-def analyze_name_group(names: list) -> dict:
-    """
-    Analyze a group of names to determine if they represent the same person or different
-    people
-    """
-    parsed_names = []
-    for name in names:
-        parsed = parse_full_name(name)
-        if parsed:
-            parsed_names.append(parsed)
+# State of the process pool workers, set once per process by `_init_worker`
+_worker_state: dict = {}
 
-    if len(parsed_names) < 2:
-        return {"same_person": True, "analysis": "Single name or unparseable names"}
 
-    # Compare each pair of names
-    different_people = []
-    analysis_details = []
+def _init_worker(state: dict):
+    global _worker_state
+    _worker_state = state
+
 
-    for i in range(len(parsed_names)):
-        for j in range(i + 1, len(parsed_names)):
-            name1 = parsed_names[i]
-            name2 = parsed_names[j]
+def _shards(n: int, workers: int) -> list[tuple[int, int]]:
+    """Split `range(n)` in contiguous shards, several per worker so the ones with
+    more pairs to compare (the first ones) don't end up in a single process."""
+    size = max(1, -(-n // (workers * 8)))
+    return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+
+def _run_sharded(
+    func: Callable[[int, int], list],
+    n: int,
+    workers: int,
+    state: dict,
+    desc: str,
+) -> list:
+    """Run `func(start, stop)` over the shards of `range(n)` and concatenate the
+    results in order.
+
+    With `workers > 1` the shards run on a process pool, where `func` reads its
+    inputs from `_worker_state`. The result is the same as the serial run.
+    """
+    shards = _shards(n, max(workers, 1))
+    results = []
+    if workers <= 1:
+        _init_worker(state)
+        try:
+            for start, stop in tqdm(shards, desc=desc):
+                results.extend(func(start, stop))
+        finally:
+            _init_worker({})
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(state,)
+    ) as executor:
+        for result in tqdm(
+            executor.map(func, *zip(*shards)), total=len(shards), desc=desc
+        ):
+            results.extend(result)
+    return results
+
+
+def _analyze_pairs(start: int, stop: int) -> list[tuple[int, int, dict]]:
+    """Compare every name in `start..stop` with the names after it, for
+    `analyze_name_group`."""
+    store: ParsedNameStore = _worker_state["store"]
+    ids = _worker_state["ids"]
+    pairs = []
+    for i in range(start, stop):
+        for j in range(i + 1, len(ids)):
+            id1 = ids[i]
+            id2 = ids[j]
 
             # Check surnames
             surnames_same = are_surnames_same(
-                name1["surnames_parts"], name2["surnames_parts"]
+                store.surnames_parts(id1), store.surnames_parts(id2)
             )
 
             # Check first names
             first_names_same = are_first_names_same(
-                name1["first_names_parts"], name2["first_names_parts"]
+                store.first_names_parts(id1), store.first_names_parts(id2)
             )
 
-            analysis_details.append(
-                {
-                    "name1": name1["surnames"] + ", " + name1["first_names"],
-                    "name2": name2["surnames"] + ", " + name2["first_names"],
-                    "surnames_same": surnames_same,
-                    "first_names_same": first_names_same,
-                    "same_person": surnames_same and first_names_same,
-                }
+            pairs.append(
+                (
+                    i,
+                    j,
+                    {
+                        "name1": store.surnames[id1] + ", " + store.first_names[id1],
+                        "name2": store.surnames[id2] + ", " + store.first_names[id2],
+                        "surnames_same": surnames_same,
+                        "first_names_same": first_names_same,
+                        "same_person": surnames_same and first_names_same,
+                    },
+                )
             )
+    return pairs
+
 
-            if not (surnames_same and first_names_same):
-                different_people.append((names[i], names[j]))
+def analyze_name_group(
+    names: list, workers: int = 1, store: ParsedNameStore | None = None
+) -> dict:
+    """
+    Analyze a group of names to determine if they represent the same person or different
+    people
+
+    With `workers > 1` the pairs are compared on a pool of processes, with the same
+    result. The names are parsed into `store`, or a new one if not given.
+    """
+    if store is None:
+        store = ParsedNameStore()
+    store.add(names)
+    ids = [i for i in store.ids(names).tolist() if store.is_parsed(i)]
+
+    if len(ids) < 2:
+        return {"same_person": True, "analysis": "Single name or unparseable names"}
+
+    # Compare each pair of names
+    pairs = _run_sharded(
+        _analyze_pairs,
+        len(ids),
+        workers,
+        {"store": store, "ids": ids},
+        desc="Analyzing names",
+    )
+    analysis_details = [details for _, _, details in pairs]
+    different_people = [
+        (names[i], names[j]) for i, j, details in pairs if not details["same_person"]
+    ]
 
     # If any pair is identified as different people, the group contains different people
     same_person = len(different_people) == 0
@@ -197,82 +461,372 @@ def analyze_name_group(names: list) -> dict:
     }
 
 
-def group_names(names: list) -> list[set[str]]:
-    name_groups: list[set[str]] = []
-    already_grouped: set[str] = set()
-    parsed_names: dict[str, dict | None] = {}
-    for i, name in tqdm(enumerate(names), total=len(names), desc="Grouping names"):
-        if name in already_grouped:
-            continue
-        if name in parsed_names:
-            name_parsed = parsed_names[name]
-        else:
-            name_parsed = parse_full_name(name)
+def _deletion_neighbourhood(token: str) -> set[str]:
+    """The token and every string obtained by deleting one of its characters.
 
-        if name_parsed is None:
-            continue
+    Two tokens at Levenshtein distance at most 1 always share an element of their
+    neighbourhoods.
+    """
+    return {token} | {token[:i] + token[i + 1 :] for i in range(len(token))}
 
-        name_set = {name}
-        for pair in names[i + 1 :]:
-            if pair in parsed_names:
-                pair_parsed = parsed_names[pair]
-            else:
-                pair_parsed = parse_full_name(pair)
-                parsed_names[pair] = pair_parsed
 
-            if pair_parsed is None:
-                continue
+def _close_tokens(tokens: list[str]) -> dict[str, list[str]]:
+    """For each token, the tokens at Levenshtein distance at most 1, itself
+    included.
 
-            surnames_same = are_surnames_same(
-                name_parsed["surnames_parts"],
-                pair_parsed["surnames_parts"],
-                threshold=1,
-            )
+    Only the tokens that share an element of their deletion neighbourhoods are
+    compared.
+    """
+    blocks: dict[str, list[str]] = defaultdict(list)
+    for token in tokens:
+        for key in _deletion_neighbourhood(token):
+            blocks[key].append(token)
+    return {
+        token: sorted(
+            {
+                other
+                for key in _deletion_neighbourhood(token)
+                for other in blocks[key]
+                if distance(token, other) <= 1
+            }
+        )
+        for token in tokens
+    }
 
-            # Check first names
-            first_names_same = are_first_names_same(
-                name_parsed["first_names_parts"],
-                pair_parsed["first_names_parts"],
-                threshold=1,
+
+class UnionFind:
+    """Disjoint sets over the integers `0..n-1`, with path halving and union by
+    size."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+
+def _canonical_order(names: list) -> list[str]:
+    """Distinct names, longest first and then alphabetically."""
+    return sorted(set(names), key=lambda x: (-len(x), x))
+
+
+def token_distances(
+    tokens1: Sequence[str],
+    tokens2: Sequence[str],
+    threshold: int,
+    pairwise: bool = False,
+) -> np.ndarray:
+    """
+    Levenshtein distances between two arrays of name tokens, computed in a single
+    native call.
+
+    Distances above `threshold` are not computed exactly, the comparison stops as
+    soon as it is exceeded and `threshold + 1` is returned.
+
+    Args:
+        tokens1 (Sequence[str]): Tokens of the rows.
+        tokens2 (Sequence[str]): Tokens of the columns.
+        threshold (int): Maximum distance of interest.
+        pairwise (bool, optional): Compare `tokens1[i]` only with `tokens2[i]`,
+            both must have the same length.
+
+    Returns:
+        np.ndarray: Matrix of shape `(len(tokens1), len(tokens2))`, or array of
+            shape `(len(tokens1),)` if `pairwise`.
+    """
+    return (cpdist if pairwise else cdist)(
+        tokens1,
+        tokens2,
+        scorer=Levenshtein.distance,
+        score_cutoff=threshold,
+        dtype=np.int32,
+    )
+
+
+def _build_match_index(ordered: list[str], store: ParsedNameStore) -> dict:
+    """Blocks of names by first surname and token arrays of the names, for
+    `_match_blocks`. The arrays are indexed by the position in `ordered`."""
+    ids = store.ids(ordered)
+    vocabulary = np.array(store.vocabulary, dtype=object)
+
+    # surname tokens of every name as ids of the store vocabulary, padded with -1
+    surname_ids = store.surname_ids(ids)
+    surname_lengths = (surname_ids >= 0).sum(axis=1)
+    first_name_ids = store.first_name_ids(ids)
+
+    blocks: dict[str, list[int]] = defaultdict(list)
+    for i, first_surname in enumerate(surname_ids[:, :1].ravel().tolist()):
+        if first_surname >= 0:
+            blocks[store.vocabulary[first_surname]].append(i)
+
+    return {
+        "ids": ids.tolist(),
+        "first_surnames": sorted(blocks),
+        "close_surnames": _close_tokens(list(blocks)),
+        "blocks": {k: np.array(v) for k, v in blocks.items()},
+        "vocabulary": vocabulary,
+        "surname_ids": surname_ids,
+        "surname_lengths": surname_lengths,
+        # first token of the first names, "" for the padding
+        "first_names": np.array([""] + store.vocabulary, dtype=object)[
+            first_name_ids[:, 0] + 1
+        ],
+    }
+
+
+def _close_surnames(index: dict, ids1: np.ndarray, ids2: np.ndarray) -> np.ndarray:
+    """
+    Whether each surname token of `ids1` is at distance at most 1 of each one of
+    `ids2`, with the distances of the distinct tokens from a single
+    `token_distances` call.
+
+    Args:
+        index (dict): Result of `_build_match_index`.
+        ids1 (np.ndarray): Surname token ids of shape `(a, l)`, -1 for padding.
+        ids2 (np.ndarray): Surname token ids of shape `(b, l)`, -1 for padding.
+
+    Returns:
+        np.ndarray: Boolean array of shape `(a, l, b, l)`, padding never matches.
+    """
+    tokens1, inverse1 = np.unique(ids1, return_inverse=True)
+    tokens2, inverse2 = np.unique(ids2, return_inverse=True)
+    close = (
+        token_distances(
+            index["vocabulary"][np.maximum(tokens1, 0)],
+            index["vocabulary"][np.maximum(tokens2, 0)],
+            threshold=1,
+        )
+        <= 1
+    )
+    close[tokens1 < 0, :] = False
+    close[:, tokens2 < 0] = False
+    return close[
+        inverse1.reshape(ids1.shape)[:, :, None, None],
+        inverse2.reshape(ids2.shape)[None, None, :, :],
+    ]
+
+
+def _same_surnames(
+    index: dict, names: np.ndarray, candidates: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    `are_surnames_same` with `threshold=1` for every name of `names` and every
+    later name of `candidates`, computed on arrays.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Indexes of the first and second name of the
+            pairs with the same surnames.
+    """
+    ids1 = index["surname_ids"][names]
+    ids2 = index["surname_ids"][candidates]
+    # close[a, i, b, j]: surname i of name a matches surname j of candidate b
+    close = _close_surnames(index, ids1, ids2)
+
+    # the shorter list of surnames, the one of the first name if they have the
+    # same length, must have a match for every surname
+    first_is_shorter = (
+        index["surname_lengths"][names][:, None]
+        <= index["surname_lengths"][candidates][None, :]
+    )
+    first_matched = (close.any(axis=3) | (ids1 < 0)[:, :, None]).all(axis=1)
+    candidate_matched = (close.any(axis=1) | (ids2 < 0)[None, :, :]).all(axis=2)
+
+    same = (
+        (candidates[None, :] > names[:, None])
+        & close[:, 0, :, 0]
+        & np.where(first_is_shorter, first_matched, candidate_matched)
+    )
+    a, b = np.nonzero(same)
+    return names[a], candidates[b]
+
+
+def _match_blocks(start: int, stop: int) -> list[tuple[int, int, dict]]:
+    """Compare the names of the blocks `start..stop` with the later names of the
+    blocks of close first surnames, for `match_names`."""
+    ordered = _worker_state["ordered"]
+    index = _worker_state["index"]
+    store: ParsedNameStore = _worker_state["store"]
+    ids = index["ids"]
+    blocks = index["blocks"]
+
+    matches = []
+    for surname in index["first_surnames"][start:stop]:
+        names = blocks[surname]
+        candidates = np.sort(
+            np.concatenate([blocks[s] for s in index["close_surnames"][surname]])
+        )
+        # bound the size of the (names, surnames, candidates, surnames) arrays
+        rows = max(1, 2**22 // (len(candidates) * index["surname_ids"].shape[1] ** 2))
+        for chunk in range(0, len(names), rows):
+            pairs1, pairs2 = _same_surnames(
+                index, names[chunk : chunk + rows], candidates
             )
+            # `are_first_names_same` starts comparing the first names
+            first_names_close = (
+                token_distances(
+                    index["first_names"][pairs1],
+                    index["first_names"][pairs2],
+                    threshold=1,
+                    pairwise=True,
+                )
+                <= 1
+            )
+            for i, j, close in zip(
+                pairs1.tolist(), pairs2.tolist(), first_names_close.tolist()
+            ):
+                # Check first names
+                first_names_same = close and are_first_names_same(
+                    store.first_names_parts(ids[i]),
+                    store.first_names_parts(ids[j]),
+                    threshold=1,
+                )
+                matches.append(
+                    (
+                        i,
+                        j,
+                        {
+                            "name1": ordered[i],
+                            "name2": ordered[j],
+                            "surnames_same": True,
+                            "first_names_same": first_names_same,
+                            "same_person": first_names_same,
+                        },
+                    )
+                )
+
+    return matches
+
+
+def match_names(
+    names: list, workers: int = 1, store: ParsedNameStore | None = None
+) -> list[dict]:
+    """
+    Compare the names with close first surnames on surnames and first names with
+    `threshold=1`.
+
+    The names are deduplicated and put in a canonical order, longest first, and
+    each pair is compared in that order, so the result doesn't depend on the order
+    of `names`. Names are blocked by first surname, and the surnames of a block are
+    checked against every name of the blocks with a first surname at distance at
+    most 1 on arrays, with the token distances from `token_distances`. Only the
+    pairs with the same surnames are compared on first names in Python. With
+    `workers > 1` the blocks are split in shards compared on a pool of processes,
+    with the same result. The names are parsed into `store`, or a new one if not
+    given.
+
+    Returns:
+        list[dict]: The evidence of every pair with the same surnames, with the same
+            keys as the `analysis_details` of `analyze_name_group`.
+    """
+    if store is None:
+        store = ParsedNameStore()
+    ordered = _canonical_order(names)
+    store.add(ordered)
+    index = _build_match_index(ordered, store)
+    matches = _run_sharded(
+        _match_blocks,
+        len(index["first_surnames"]),
+        workers,
+        {"ordered": ordered, "index": index, "store": store},
+        desc="Matching names",
+    )
+    matches.sort(key=lambda m: (m[0], m[1]))
+    return [match for _, _, match in matches]
 
-            if surnames_same and first_names_same:
-                name_set.add(pair)
 
-        name_groups.append(name_set)
-        already_grouped.update(name_set)
+def group_names(
+    names: list,
+    matches: list[dict] | None = None,
+    workers: int = 1,
+    store: ParsedNameStore | None = None,
+) -> list[set[str]]:
+    """
+    Group the names that refer to the same person.
+
+    Names are clustered with union-find over the pairs `match_names` finds to be the
+    same person, so matches are transitive and every name ends up in exactly one
+    group. Names that can't be parsed are left out.
+
+    Args:
+        names (list): Names to group.
+        matches (list[dict], optional): Result of `match_names` for `names`, to
+            reuse evidence already computed.
+        workers (int, optional): Number of processes used by `match_names`.
+        store (ParsedNameStore, optional): Parsed names shared with the caller,
+            the names missing from it are added.
+
+    Returns:
+        list[set[str]]: The groups, ordered by their first name in the canonical
+            order (longest first and then alphabetically).
+    """
+    if store is None:
+        store = ParsedNameStore()
+    if matches is None:
+        matches = match_names(names, workers=workers, store=store)
+
+    ordered = _canonical_order(names)
+    store.add(ordered)
+    index = {name: i for i, name in enumerate(ordered)}
+    clusters = UnionFind(len(ordered))
+    for match in matches:
+        if match["same_person"]:
+            clusters.union(index[match["name1"]], index[match["name2"]])
+
+    groups: dict[int, set[str]] = {}
+    for i, name in enumerate(ordered):
+        if not store.is_parsed(store.id(name)):
+            continue
+        groups.setdefault(clusters.find(i), set()).add(name)
 
-    return name_groups
+    return list(groups.values())
 
 
-def get_people_list(df: pl.DataFrame) -> tuple[list[Person], dict[str, str]]:
+def get_people_list(
+    df: pl.DataFrame, workers: int = 1, store: ParsedNameStore | None = None
+) -> tuple[list[Person], dict[str, str]]:
     """
-    Find duplicated people in a list of names
+    Find duplicated people in a list of names, comparing them on `workers`
+    processes. Each name is parsed once, into `store` if given.
     """
     names = (
         df.select(pl.concat_list("authors", "contributors").alias("people"))
         .explode("people")
         .drop_nulls()
-        .unique()
-        .sort(pl.col("people").str.len_chars(), descending=True)["people"]
+        .unique()["people"]
         .to_list()
     )
 
-    name_groups = group_names(names)
+    if store is None:
+        store = ParsedNameStore()
+    store.add(names)
+    name_groups = group_names(names, workers=workers, store=store)
 
     people: list[Person] = []
 
     people_to_nname_mapping: dict[str, str] = {}
     for name_set in name_groups:
-        shorter_name = min(name_set, key=lambda x: len(x))
-        name_parsed = parse_full_name(shorter_name)
-        if name_parsed is None:
+        shorter_name = min(name_set, key=lambda x: (len(x), x))
+        shorter_id = store.id(shorter_name)
+        if not store.is_parsed(shorter_id):
             raise ValueError(f"Failed to parse name: {shorter_name}")
 
-        normalized_name = f"{name_parsed['first_names_normalized']}_{name_parsed['surnames_normalized']}"
+        normalized_name = store.normalized_name(shorter_id)
         for name in name_set:
             people_to_nname_mapping[name] = normalized_name
-        people.append(Person(normalized_name=normalized_name, aliases=list(name_set)))
+        people.append(Person(normalized_name=normalized_name, aliases=sorted(name_set)))
 
     return people, people_to_nname_mapping
 
@@ -285,44 +839,127 @@ class StructuredNameResponse(BaseModel):
     person: bool
 
 
+# Lowercase words that are part of names
+_NAME_PARTICLES = {
+    "da", "das", "de", "del", "della", "di", "do", "dos", "la", "las", "le", "los",
+    "der", "van", "von", "y",
+}  # fmt: skip
+# Common first names, without accents, to tell the first names after the comma
+# from surnames written first
+_FIRST_NAMES = {
+    "adrian", "adriana", "agustin", "agustina", "alberto", "alejandra", "alejandro",
+    "alexis", "alfredo", "alicia", "alvaro", "ana", "analia", "andrea", "andres",
+    "angel", "anna", "antonio", "ariel", "beatriz", "belen", "bernardo", "bruno",
+    "camila", "carla", "carlos", "carmen", "carolina", "catalina", "cecilia", "cesar",
+    "christian", "claudia", "claudio", "cristian", "cristina", "daniel", "daniela",
+    "dario", "david", "diego", "eduardo", "elena", "eliana", "elisa", "emilia",
+    "emiliano", "emilio", "enrique", "ernesto", "esteban", "eugenia", "fabian",
+    "facundo", "federico", "felipe", "fernanda", "fernando", "florencia", "francisco",
+    "franco", "gabriel", "gabriela", "gaston", "gerardo", "german", "gonzalo",
+    "graciela", "guillermo", "gustavo", "hector", "hernan", "horacio", "hugo",
+    "ignacio", "ines", "isabel", "ivan", "javier", "jimena", "joaquin", "jorge",
+    "jose", "juan", "julia", "julian", "julieta", "julio", "laura", "leandro",
+    "leonardo", "leticia", "lorena", "lucas", "lucia", "luciana", "luis",
+    "magdalena", "manuel", "marcelo", "marcos", "maria", "mariana", "mario",
+    "martin", "martina", "mateo", "matias", "mauricio", "mauro", "maximiliano",
+    "mercedes", "micaela", "miguel", "monica", "natalia", "nicolas", "noelia",
+    "oscar", "pablo", "paola", "patricia", "paula", "pedro", "rafael", "ramiro",
+    "raul", "ricardo", "roberto", "rodrigo", "romina", "rosa", "ruben", "santiago",
+    "sebastian", "sergio", "silvana", "silvia", "sofia", "soledad", "tomas",
+    "valentina", "valeria", "veronica", "victor", "victoria", "virginia", "walter",
+}  # fmt: skip
+# Words that show the text has more than a name, compared without accents or dots
+_NOT_NAME_WORDS = {
+    "al", "centro", "comision", "departamento", "dept", "dr", "dra", "et",
+    "facultad", "grupo", "ing", "instituto", "lab", "laboratorio", "lic", "msc",
+    "phd", "prof", "udelar", "universidad",
+}  # fmt: skip
+_NAME_WORD = re.compile(r"^[^\W\d_]+(?:['’-][^\W\d_]+)*$")
+_INITIAL = re.compile(r"^[^\W\d_]\.?$")
+
+
+def parse_name_locally(name: str) -> tuple[StructuredNameResponse | None, float]:
+    """
+    Parse a name written as "Surnames, First names" with rules, without OpenAI.
+
+    The confidence goes from 0 to 1 and drops with lowercase words that aren't
+    particles, names in uppercase and too many words. It also drops when the text
+    may be written as "First names, Surnames": when there are more words after the
+    comma than before it, or a single one, and they aren't all common first names.
+    Texts with more than one comma, digits, symbols or words like "Facultad" or
+    "Dr." aren't parsed.
+
+    Returns:
+        tuple[StructuredNameResponse | None, float]: The name, or None if the text
+            can't be parsed, and the confidence.
+    """
+    parts = name.split(",")
+    if len(parts) != 2:
+        return None, 0.0
+    surnames = parts[0].split()
+    first_names = parts[1].split()
+    if not surnames or not first_names:
+        return None, 0.0
+    if all(w.lower() in _NAME_PARTICLES for w in surnames):
+        return None, 0.0
+
+    confidence = 1.0
+    words = [(w, False) for w in surnames] + [(w, True) for w in first_names]
+    for word, is_first_name in words:
+        if unidecode(word.lower()).strip(".") in _NOT_NAME_WORDS:
+            return None, 0.0
+        if word.lower() in _NAME_PARTICLES:
+            continue
+        # initials are only expected in the first names
+        if is_first_name and _INITIAL.match(word):
+            if not word[0].isupper():
+                confidence -= 0.3
+            continue
+        if not _NAME_WORD.match(word):
+            return None, 0.0
+        if not word[0].isupper():
+            confidence -= 0.3
+        elif len(word) > 1 and word.isupper():
+            confidence -= 0.1
+
+    if len(surnames) > 3 or len(first_names) > 3:
+        confidence -= 0.3
+    if (len(first_names) > len(surnames) or len(first_names) == 1) and not all(
+        unidecode(w.lower()) in _FIRST_NAMES
+        for w in first_names
+        if w.lower() not in _NAME_PARTICLES and not _INITIAL.match(w)
+    ):
+        confidence -= 0.3
+
+    return (
+        StructuredNameResponse(
+            surnames=" ".join(surnames), first_names=" ".join(first_names), person=True
+        ),
+        max(confidence, 0.0),
+    )
+
+
 async def extract_person_name(
-    person: Person, *, pbar: tqdm | None = None
+    person: Person,
+    *,
+    pbar: tqdm | None = None,
+    service: "NameExtractionService | None" = None,
 ) -> StructuredNameResponse | None:
-    """Extract a name from a person"""
+    """
+    Extract a name from a person
 
-    longest_alias = max(person.aliases, key=len) if person.aliases else None
-    if not longest_alias:
-        return None
+    Pass a `NameExtractionService` to share its client and limits between calls,
+    otherwise a new one is created and closed for this call.
+    """
+    from udelar_graph.processing.name_extraction import NameExtractionService
 
-    prompt = """\
-You are an expert extracting people names from unstructured text. \
-You'll be given a name in any format and will return a json object with the following \
-format.  If there is extra information on the text, like the institution, the \
-position, etc, you should return it in the "institution" and "department" fields. \
-The names are mostly in spanish and can appear in any order.
-
-{
-    "surnames": "string",
-    "first_names": "string",
-    "institution": "string" | None,
-    "department": "string" | None,
-    "person": bool # True if the text is a person name, False otherwise.
-}
-
-If the text is not a person name, return None.
-"""
-    client = openai.AsyncOpenAI()
-    response = await client.responses.parse(
-        model="gpt-4o-mini",
-        temperature=0.0,
-        input=[
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": longest_alias},
-        ],
-        text_format=StructuredNameResponse,
-    )
+    if service is not None:
+        _, extracted_name = await service.extract_person(person)
+    else:
+        async with NameExtractionService() as own_service:
+            _, extracted_name = await own_service.extract_person(person)
 
     if pbar is not None:
         pbar.update(1)
 
-    return response.output_parsed
+    return extracted_name
@@ -0,0 +1,82 @@
+"""
+Normalization of titles and names with Polars string expressions.
+
+The per-character steps that depend on Unicode (accent folding and which
+characters are punctuation or whitespace) are done with a transliteration table
+built for the distinct non-ASCII characters of each batch, so Python is called
+once per character instead of once per row. The results are the same as
+`normalize_work_name` and `unidecode`.
+"""
+
+import re
+from functools import lru_cache, partial
+from typing import Callable
+
+import polars as pl
+from unidecode import unidecode
+
+NON_ASCII = r"[^\x00-\x7f]"
+# ASCII characters matched by `[^\w\s]`
+_ASCII_PUNCTUATION = r"[\x00-\x08\x0e-\x1b\x7f!-/:-@\[-\^`{-~]"
+# ASCII characters matched by `\s`
+_ASCII_WHITESPACE = r"[\t-\r\x1c-\x1f ]+"
+
+
+@lru_cache(maxsize=None)
+def _fold_char(char: str) -> str:
+    return unidecode(char)
+
+
+@lru_cache(maxsize=None)
+def _strip_char(char: str) -> str:
+    """Removes the character if `[^\\w\\s]` matches it, and replaces whitespace
+    with a space, to be collapsed with the ASCII whitespace."""
+    if char.isspace():
+        return " "
+    return char if re.match(r"\w", char) else ""
+
+
+def _translate(series: pl.Series, char_map: Callable[[str], str]) -> pl.Series:
+    strings = series.explode() if series.dtype == pl.List else series
+    chars = strings.str.extract_all(NON_ASCII).explode().drop_nulls().unique()
+    table = {c: char_map(c) for c in chars if char_map(c) != c}
+    if not table:
+        return series
+    if series.dtype == pl.List:
+        return series.list.eval(pl.element().str.replace_many(table))
+    return series.str.replace_many(table)
+
+
+def _map_chars(
+    expr: pl.Expr, char_map: Callable[[str], str], return_dtype: pl.DataType
+) -> pl.Expr:
+    return expr.map_batches(
+        partial(_translate, char_map=char_map),
+        return_dtype=return_dtype,
+        is_elementwise=True,
+    )
+
+
+def fold_accents(expr: pl.Expr, return_dtype: pl.DataType = pl.String()) -> pl.Expr:
+    """
+    Transliterates the strings of `expr` to ASCII, like `unidecode`.
+
+    Args:
+        expr (pl.Expr): Strings, or lists of strings.
+        return_dtype (pl.DataType, optional): `pl.List(pl.String)` for lists.
+    """
+    return _map_chars(expr, _fold_char, return_dtype)
+
+
+def normalize_titles(expr: pl.Expr) -> pl.Expr:
+    """
+    Normalizes the titles of `expr` like `normalize_work_name`: removes the
+    punctuation, replaces the whitespace with underscores, lowercases and
+    transliterates to ASCII.
+    """
+    return fold_accents(
+        _map_chars(expr, _strip_char, pl.String())
+        .str.replace_all(_ASCII_PUNCTUATION, "")
+        .str.replace_all(_ASCII_WHITESPACE, "_")
+        .str.to_lowercase()
+    ).str.replace_all("-", "", literal=True)
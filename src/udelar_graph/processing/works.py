@@ -1,5 +1,9 @@
 import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterable
 
+from rapidfuzz.distance import Levenshtein
 from unidecode import unidecode
 
 
@@ -8,3 +12,68 @@ def normalize_work_name(title: str) -> str:
     no_punctuation = re.sub(r"[^\w\s]", "", title)
     no_spaces = re.sub(r"\s+", "_", no_punctuation)
     return unidecode(no_spaces.lower()).replace("-", "")
+
+
+@lru_cache
+def _partition(length: int, parts: int) -> tuple[tuple[int, int], ...]:
+    """Start and length of `parts` contiguous segments of a string of `length`,
+    the last ones one character longer when it doesn't divide evenly."""
+    base, extra = divmod(length, parts)
+    segments = []
+    start = 0
+    for i in range(parts):
+        size = base + (i >= parts - extra)
+        segments.append((start, size))
+        start += size
+    return tuple(segments)
+
+
+class TitleIndex:
+    """
+    Index of titles to find the ones at Levenshtein distance at most
+    `max_distance` of a query, with the PassJoin partition scheme.
+
+    Each title is split in `max_distance + 1` segments. A title within
+    `max_distance` edits of the query has at least one segment that isn't edited,
+    so it appears in the query at most `max_distance` positions away from where it
+    starts in the title. Only the titles with such a segment are compared, with the
+    exact distance.
+    """
+
+    def __init__(self, titles: Iterable[str], max_distance: int = 4):
+        self.max_distance = max_distance
+        self.titles = list(dict.fromkeys(titles))
+        self._segments: dict[tuple[int, int, str], list[int]] = defaultdict(list)
+        # titles too short to have a character in every segment, always compared
+        self._short: list[int] = []
+        for i, title in enumerate(self.titles):
+            if len(title) <= max_distance:
+                self._short.append(i)
+                continue
+            for k, (start, size) in enumerate(_partition(len(title), max_distance + 1)):
+                self._segments[(len(title), k, title[start : start + size])].append(i)
+
+    def _candidates(self, query: str) -> set[int]:
+        d = self.max_distance
+        candidates = set(self._short)
+        for length in range(max(len(query) - d, d + 1), len(query) + d + 1):
+            for k, (start, size) in enumerate(_partition(length, d + 1)):
+                for pos in range(
+                    max(0, start - d), min(len(query) - size, start + d) + 1
+                ):
+                    candidates.update(
+                        self._segments.get((length, k, query[pos : pos + size]), ())
+                    )
+        return candidates
+
+    def search(self, query: str) -> list[str]:
+        """Titles at distance at most `max_distance` of `query`, in the order they
+        were indexed."""
+        return [
+            self.titles[i]
+            for i in sorted(self._candidates(query))
+            if Levenshtein.distance(
+                query, self.titles[i], score_cutoff=self.max_distance
+            )
+            <= self.max_distance
+        ]
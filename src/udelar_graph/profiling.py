@@ -0,0 +1,72 @@
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Iterator
+
+_recorded: list["StageTiming"] | None = None
+
+
+@dataclass
+class StageTiming:
+    """Wall time and memory of a load stage.
+
+    Attributes:
+        name: Stage name, prefixed by the loader (e.g. "colibri.group_names")
+        rows: Rows processed by the stage, set by the stage itself
+        seconds: Wall time
+        peak_rss_mb: Peak resident memory of the process when the stage ended
+    """
+
+    name: str
+    rows: int | None = None
+    seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float | None:
+        if self.rows is None or self.seconds == 0:
+            return None
+        return self.rows / self.seconds
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "rows_per_second": self.rows_per_second}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of the process, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+@contextmanager
+def stage(name: str, rows: int | None = None) -> Iterator[StageTiming]:
+    """Time a load stage.
+
+    Timings are only kept inside `record_stages`, otherwise this is a no-op. The
+    stage can set `rows` on the yielded object when the count is only known at the
+    end.
+    """
+    timing = StageTiming(name, rows)
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.seconds = time.perf_counter() - start
+        timing.peak_rss_mb = peak_rss_mb()
+        if _recorded is not None:
+            _recorded.append(timing)
+
+
+@contextmanager
+def record_stages() -> Iterator[list[StageTiming]]:
+    """Collect the timings of every stage run inside the block."""
+    global _recorded
+    previous = _recorded
+    _recorded = []
+    try:
+        yield _recorded
+    finally:
+        _recorded = previous
@@ -1,22 +1,365 @@
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Literal
+from typing import Any, Callable, Literal, Protocol, Sequence
 
+from loguru import logger
 from neo4j import Driver as Neo4jDriver
-from neo4j import ManagedTransaction
+from neo4j import ManagedTransaction, Session
+from neo4j.exceptions import DriverError, Neo4jError
+from tqdm import tqdm
+
+from udelar_graph.models import Person, Work, WorkKeyword, WorkType, content_hash
+
+PeopleToWorkRel = Literal["AUTHOR_OF", "CONTRIBUTOR_OF"]
+
+UPSERT_PERSON_QUERY = """\
+UNWIND $rows AS row
+MERGE (p:Person {normalized_name: row.normalized_name})
+SET p.names = row.names,
+    p.surnames = row.surnames,
+    p.aliases = row.aliases,
+    p.content_hash = row.content_hash
+"""
+
+DUPLICATED_PEOPLE_QUERY = """\
+MATCH (p:Person)
+WITH p.normalized_name AS normalized_name, collect(p) AS nodes
+WHERE size(nodes) > 1
+RETURN normalized_name, [n IN nodes | elementId(n)] AS ids
+"""
+
+MERGE_PEOPLE_QUERY = """\
+MATCH (keep:Person) WHERE elementId(keep) = $keep_id
+MATCH (dup:Person) WHERE elementId(dup) IN $duplicate_ids
+CALL (keep, dup) {
+    MATCH (dup)-[:AUTHOR_OF]->(w:Work)
+    MERGE (keep)-[:AUTHOR_OF]->(w)
+}
+CALL (keep, dup) {
+    MATCH (dup)-[:CONTRIBUTOR_OF]->(w:Work)
+    MERGE (keep)-[:CONTRIBUTOR_OF]->(w)
+}
+WITH keep, collect(dup) AS dups
+SET keep.aliases = reduce(
+    aliases = coalesce(keep.aliases, []),
+    alias IN reduce(acc = [], d IN dups | acc + coalesce(d.aliases, [])) |
+    CASE WHEN alias IN aliases THEN aliases ELSE aliases + alias END
+)
+FOREACH (d IN dups | DETACH DELETE d)
+RETURN size(dups) AS merged
+"""
+
+UPSERT_WORK_QUERY = """\
+UNWIND $rows AS row
+MERGE (w:Work {normalized_title: row.normalized_title})
+SET w.title = row.title,
+    w.abstract = row.abstract,
+    w.type = row.type,
+    w.pdf_url = row.pdf_url,
+    w.source = row.source,
+    w.language = row.language,
+    w.content_hash = row.content_hash
+"""
+
+CREATE_WORK_TYPE_QUERY = """\
+UNWIND $rows AS row
+MATCH (w:Work {normalized_title: row.normalized_title})
+MERGE (t:WorkType {type: row.type})
+MERGE (w)-[:TYPE]->(t)
+"""
+
+CREATE_WORK_KEYWORD_QUERY = """\
+UNWIND $rows AS row
+MATCH (w:Work {normalized_title: row.normalized_title})
+MERGE (k:Keyword {keyword: row.keyword})
+MERGE (w)-[:KEYWORD]->(k)
+"""
+
+CREATE_PEOPLE_TO_WORK_QUERY = """\
+UNWIND $rows AS row
+MATCH
+    (p:Person {{normalized_name: row.normalized_name}}),
+    (w:Work {{normalized_title: row.normalized_title}})
+MERGE (p)-[:{rel}]->(w)
+"""
+
+DELETE_PEOPLE_QUERY = """\
+UNWIND $rows AS row
+MATCH (p:Person {normalized_name: row.normalized_name})
+DETACH DELETE p
+"""
+
+DELETE_WORKS_QUERY = """\
+UNWIND $rows AS row
+MATCH (w:Work {normalized_title: row.normalized_title})
+DETACH DELETE w
+"""
+
+DELETE_WORK_TYPE_QUERY = """\
+UNWIND $rows AS row
+MATCH (:Work {normalized_title: row.normalized_title})-[r:TYPE]->
+    (:WorkType {type: row.type})
+DELETE r
+"""
+
+DELETE_WORK_KEYWORD_QUERY = """\
+UNWIND $rows AS row
+MATCH (:Work {normalized_title: row.normalized_title})-[r:KEYWORD]->
+    (:Keyword {keyword: row.keyword})
+DELETE r
+"""
+
+DELETE_PEOPLE_TO_WORK_QUERY = """\
+UNWIND $rows AS row
+MATCH (:Person {{normalized_name: row.normalized_name}})-[r:{rel}]->
+    (:Work {{normalized_title: row.normalized_title}})
+DELETE r
+"""
+
+DELETE_ORPHAN_TERMS_QUERY = """\
+MATCH (n)
+WHERE (n:WorkType OR n:Keyword) AND NOT (n)--()
+DELETE n
+"""
+
+
+def person_row(person: Person) -> dict:
+    """Parameters of a single `Person` row for `UPSERT_PERSON_QUERY`."""
+    return {
+        "normalized_name": person.normalized_name,
+        "aliases": person.aliases,
+        "names": person.names,
+        "surnames": person.surnames,
+        "content_hash": content_hash(person),
+    }
+
+
+def work_row(work: Work) -> dict:
+    """Parameters of a single `Work` row for `UPSERT_WORK_QUERY`."""
+    return {
+        "normalized_title": work.normalized_title,
+        "title": work.title,
+        "abstract": work.abstract,
+        "type": work.type,
+        "pdf_url": work.pdf_url,
+        "source": work.source,
+        "language": work.language,
+        "content_hash": content_hash(work),
+    }
+
+
+def work_type_row(rel: tuple[Work, WorkType]) -> dict:
+    """Parameters of a single row for `CREATE_WORK_TYPE_QUERY`."""
+    work, type = rel
+    return {"normalized_title": work.normalized_title, "type": type.type}
+
+
+def work_keyword_row(rel: tuple[Work, WorkKeyword]) -> dict:
+    """Parameters of a single row for `CREATE_WORK_KEYWORD_QUERY`."""
+    work, keyword = rel
+    return {"normalized_title": work.normalized_title, "keyword": keyword.keyword}
+
+
+def partition_rows(
+    rows: Sequence, key: Callable[[Any], tuple[str, str]], n: int
+) -> list[list[list]]:
+    """Split rows into `n` rounds of `n` partitions that never share a node.
+
+    Each row is assigned to the bucket `(hash(a) % n, hash(b) % n)` of the two nodes
+    `(a, b)` it touches. Round `r` takes the buckets `(i, (i + r) % n)` for every `i`,
+    so the partitions of a round have pairwise different buckets on both sides and
+    can be written concurrently without competing for the same node locks.
+
+    Args:
+        rows: Rows to partition
+        key: Function returning the keys of the two nodes touched by a row
+        n: Number of partitions per round
+
+    Returns:
+        List of rounds, each one a list of partitions.
+    """
+    buckets: dict[tuple[int, int], list] = defaultdict(list)
+    for row in rows:
+        a, b = key(row)
+        buckets[(zlib.crc32(a.encode()) % n, zlib.crc32(b.encode()) % n)].append(row)
+    return [[buckets[(i, (i + r) % n)] for i in range(n)] for r in range(n)]
 
-from udelar_graph.models import Person, Work, WorkKeyword, WorkType
+
+def people_to_work_row(rel: tuple[Person, Work]) -> dict:
+    """Parameters of a single row for `CREATE_PEOPLE_TO_WORK_QUERY`."""
+    person, work = rel
+    return {
+        "normalized_name": person.normalized_name,
+        "normalized_title": work.normalized_title,
+    }
+
+
+def people_to_work_key(rel: tuple[Person, Work]) -> tuple[str, str]:
+    """Keys of the nodes touched by a person-work relationship."""
+    person, work = rel
+    return person.normalized_name, work.normalized_title
+
+
+def work_keyword_key(rel: tuple[Work, WorkKeyword]) -> tuple[str, str]:
+    """Keys of the nodes touched by a work-keyword relationship."""
+    work, keyword = rel
+    return work.normalized_title, keyword.keyword
+
+
+class GraphRepository(Protocol):
+    """Write methods used by the loaders.
+
+    Implemented by `UdelarGraphRepository` on Neo4j and by `InMemoryGraphRepository`,
+    so `populate_graph_colibri` and `load_openalex_works` can run without a
+    database. Node writes are upserts on the node key and relationships are only
+    created between existing `Person` and `Work` nodes.
+    """
+
+    def close(self): ...
+
+    def create_person_batch(self, persons: list[Person]): ...
+
+    def create_works_batch(self, works: list[Work]): ...
+
+    def update_works_batch(self, works: list[Work]): ...
+
+    def create_work_type_batch(self, rels: list[tuple[Work, WorkType]]): ...
+
+    def create_work_keyword_batch(self, rels: list[tuple[Work, WorkKeyword]]): ...
+
+    def create_authorship_relationship_batch(self, rels: list[tuple[Person, Work]]): ...
+
+    def create_contributor_relationship_batch(
+        self, rels: list[tuple[Person, Work]]
+    ): ...
 
 
 @dataclass
 class UdelarGraphRepository:
-    """Repository class for managing Udelar graph data in Neo4j."""
+    """Repository class for managing Udelar graph data in Neo4j.
+
+    Batch writes are split in chunks of `chunk_size` rows, each one committed in its
+    own transaction. A chunk that fails with a retryable error is retried up to
+    `max_chunk_retries` times without replaying the chunks already committed.
+
+    With `workers > 1` relationship batches are written by a pool of threads, each
+    with its own session, over partitions that never share a node (see
+    `partition_rows`).
+    """
 
     driver: Neo4jDriver
+    chunk_size: int = 1000
+    max_chunk_retries: int = 3
+    show_progress: bool = True
+    workers: int = 1
 
     def close(self):
         """Close the Neo4j driver connection."""
         self.driver.close()
 
+    def _write_chunk(
+        self,
+        session: Session,
+        tx_func: Callable[..., Any],
+        chunk: Sequence,
+        *args,
+    ):
+        """Commit a single chunk, retrying it on retryable errors.
+
+        `execute_write` already retries transient errors inside its own time budget,
+        this adds a backoff between whole attempts so a chunk survives longer outages
+        such as a leader switch or a restarted server.
+        """
+        for attempt in range(1, self.max_chunk_retries + 1):
+            try:
+                session.execute_write(tx_func, chunk, *args)
+                return
+            except (Neo4jError, DriverError) as e:
+                if not e.is_retryable() or attempt == self.max_chunk_retries:
+                    raise
+                logger.warning(
+                    f"Chunk of {len(chunk)} rows failed ({e}), "
+                    f"retrying ({attempt}/{self.max_chunk_retries})"
+                )
+                time.sleep(2**attempt)
+
+    def _write_chunked(
+        self,
+        tx_func: Callable[..., Any],
+        rows: Sequence,
+        *args,
+        desc: str,
+    ):
+        """Write `rows` in chunks of `chunk_size`, one transaction per chunk.
+
+        Args:
+            tx_func: Batch transaction function, called as `tx_func(tx, chunk, *args)`
+            rows: Rows to write
+            desc: Description shown in the progress bar
+        """
+        if len(rows) == 0:
+            return
+        with tqdm(total=len(rows), desc=desc, disable=not self.show_progress) as pbar:
+            self._write_session(tx_func, rows, *args, pbar=pbar)
+
+    def _write_session(
+        self,
+        tx_func: Callable[..., Any],
+        rows: Sequence,
+        *args,
+        pbar: tqdm,
+    ):
+        """Write `rows` chunk by chunk on a new session."""
+        with self.driver.session() as session:
+            for start in range(0, len(rows), self.chunk_size):
+                chunk = rows[start : start + self.chunk_size]
+                self._write_chunk(session, tx_func, chunk, *args)
+                pbar.update(len(chunk))
+
+    def _write_partitioned(
+        self,
+        tx_func: Callable[..., Any],
+        rows: Sequence,
+        *args,
+        key: Callable[[Any], tuple[str, str]],
+        desc: str,
+    ):
+        """Write relationship rows concurrently over `workers` threads.
+
+        Falls back to `_write_chunked` when `workers` is 1. Otherwise the rows are
+        split with `partition_rows` and the partitions of each round are written in
+        parallel, waiting for a round to finish before starting the next one.
+
+        Args:
+            tx_func: Batch transaction function, called as `tx_func(tx, chunk, *args)`
+            rows: Rows to write
+            key: Function returning the keys of the two nodes touched by a row
+            desc: Description shown in the progress bar
+        """
+        if self.workers <= 1:
+            self._write_chunked(tx_func, rows, *args, desc=desc)
+            return
+        if len(rows) == 0:
+            return
+        rounds = partition_rows(rows, key, self.workers)
+        with (
+            ThreadPoolExecutor(max_workers=self.workers) as executor,
+            tqdm(total=len(rows), desc=desc, disable=not self.show_progress) as pbar,
+        ):
+            for partitions in rounds:
+                futures = [
+                    executor.submit(
+                        self._write_session, tx_func, partition, *args, pbar=pbar
+                    )
+                    for partition in partitions
+                    if partition
+                ]
+                for future in futures:
+                    future.result()
+
     def _create_person_tx(self, tx: ManagedTransaction, person: Person):
         """Create or update a person node in the transaction.
 
@@ -24,28 +367,18 @@ class UdelarGraphRepository:
             tx: Neo4j transaction
             person: Person object to create/update
         """
-        query = """\
-        MERGE (p:Person {normalized_name: $normalized_name, names: $names, surnames: $surnames})
-        ON CREATE SET p.aliases = $aliases
-        ON MATCH SET p.aliases = $aliases
-        """
-        tx.run(
-            query,
-            normalized_name=person.normalized_name,
-            aliases=person.aliases,
-            names=person.names,
-            surnames=person.surnames,
-        )
+        self._create_person_batch_tx(tx, [person])
 
     def _create_person_batch_tx(self, tx: ManagedTransaction, persons: list[Person]):
         """Create or update multiple person nodes in the transaction.
 
+        All the rows are sent in a single `UNWIND` statement.
+
         Args:
             tx: Neo4j transaction
             persons: List of Person objects to create/update
         """
-        for p in persons:
-            self._create_person_tx(tx, p)
+        tx.run(UPSERT_PERSON_QUERY, rows=[person_row(p) for p in persons])
 
     def create_person(self, person: Person):
         """Create or update a single person node.
@@ -62,8 +395,49 @@ class UdelarGraphRepository:
         Args:
             persons: List of Person objects to create/update
         """
+        self._write_chunked(self._create_person_batch_tx, persons, desc="People")
+
+    def _merge_people_tx(
+        self, tx: ManagedTransaction, keep_id: str, duplicate_ids: list[str]
+    ) -> int:
+        """Merge duplicated person nodes into one in the transaction.
+
+        Args:
+            tx: Neo4j transaction
+            keep_id: Element id of the node to keep
+            duplicate_ids: Element ids of the nodes merged into `keep_id` and deleted
+
+        Returns:
+            Number of deleted nodes
+        """
+        record = tx.run(
+            MERGE_PEOPLE_QUERY, keep_id=keep_id, duplicate_ids=duplicate_ids
+        ).single()
+        return record["merged"] if record else 0
+
+    def dedupe_people(self) -> int:
+        """Merge person nodes that share a `normalized_name`.
+
+        For each duplicated name one node is kept, it receives the relationships and
+        aliases of the others and the rest are deleted. Each name is merged in its
+        own transaction.
+
+        Returns:
+            Number of deleted nodes
+        """
         with self.driver.session() as session:
-            session.execute_write(self._create_person_batch_tx, persons)
+            groups = session.execute_read(
+                lambda tx: [r.data() for r in tx.run(DUPLICATED_PEOPLE_QUERY)]
+            )
+            merged = 0
+            for group in tqdm(
+                groups, desc="Merging people", disable=not self.show_progress
+            ):
+                keep_id, *duplicate_ids = group["ids"]
+                merged += session.execute_write(
+                    self._merge_people_tx, keep_id, duplicate_ids
+                )
+        return merged
 
     def _upsert_work_tx(self, tx: ManagedTransaction, work: Work):
         """Create or update a work node in the transaction.
@@ -72,41 +446,18 @@ class UdelarGraphRepository:
             tx: Neo4j transaction
             work: Work object to create/update
         """
-        query = """
-        MERGE (w:Work {normalized_title: $normalized_title}) 
-        ON CREATE SET w.title = $title,
-                      w.abstract = $abstract,
-                      w.type = $type,
-                      w.pdf_url = $pdf_url,
-                      w.source = $source,
-                      w.language = $language
-        ON MATCH SET w.title = $title,
-                      w.abstract = $abstract,
-                      w.type = $type,
-                      w.pdf_url = $pdf_url,
-                      w.source = $source,
-                      w.language = $language
-        """
-        tx.run(
-            query,
-            normalized_title=work.normalized_title,
-            title=work.title,
-            abstract=work.abstract,
-            type=work.type,
-            pdf_url=work.pdf_url,
-            source=work.source,
-            language=work.language,
-        )
+        self._upsert_work_batch_tx(tx, [work])
 
     def _upsert_work_batch_tx(self, tx: ManagedTransaction, works: list[Work]):
         """Create or update multiple work nodes in the transaction.
 
+        All the rows are sent in a single `UNWIND` statement.
+
         Args:
             tx: Neo4j transaction
             works: List of Work objects to create/update
         """
-        for w in works:
-            self._upsert_work_tx(tx, w)
+        tx.run(UPSERT_WORK_QUERY, rows=[work_row(w) for w in works])
 
     def create_work(self, work: Work):
         """Create or update a single work node.
@@ -132,8 +483,7 @@ class UdelarGraphRepository:
         Args:
             works: List of Work objects to create/update
         """
-        with self.driver.session() as session:
-            session.execute_write(self._upsert_work_batch_tx, works)
+        self._write_chunked(self._upsert_work_batch_tx, works, desc="Works")
 
     def update_works_batch(self, works: list[Work]):
         """Update multiple work nodes.
@@ -141,8 +491,7 @@ class UdelarGraphRepository:
         Args:
             works: List of Work objects to update
         """
-        with self.driver.session() as session:
-            session.execute_write(self._upsert_work_batch_tx, works)
+        self._write_chunked(self._upsert_work_batch_tx, works, desc="Works")
 
     def _create_work_type_tx(self, tx: ManagedTransaction, work: Work, type: WorkType):
         """Create a work type relationship in the transaction.
@@ -152,24 +501,20 @@ class UdelarGraphRepository:
             work: Work object
             type: WorkType object
         """
-        query = """
-        MATCH (w:Work {normalized_title: $normalized_title})
-        MERGE (t:WorkType {type: $type})
-        MERGE (w)-[:TYPE]->(t)
-        """
-        tx.run(query, normalized_title=work.normalized_title, type=type.type)
+        self._create_work_type_batch_tx(tx, [(work, type)])
 
     def _create_work_type_batch_tx(
         self, tx: ManagedTransaction, rels: list[tuple[Work, WorkType]]
     ):
         """Create multiple work type relationships in the transaction.
 
+        All the rows are sent in a single `UNWIND` statement.
+
         Args:
             tx: Neo4j transaction
             rels: List of (Work, WorkType) tuples to create relationships for
         """
-        for w, t in rels:
-            self._create_work_type_tx(tx, w, t)
+        tx.run(CREATE_WORK_TYPE_QUERY, rows=[work_type_row(r) for r in rels])
 
     def create_work_type(self, work: Work, type: WorkType):
         """Create a single work type relationship.
@@ -190,8 +535,7 @@ class UdelarGraphRepository:
         Args:
             rels: List of (Work, WorkType) tuples to create relationships for
         """
-        with self.driver.session() as session:
-            session.execute_write(self._create_work_type_batch_tx, rels)
+        self._write_chunked(self._create_work_type_batch_tx, rels, desc="Work types")
 
     def _create_work_keyword_tx(
         self, tx: ManagedTransaction, work: Work, keyword: WorkKeyword
@@ -203,24 +547,20 @@ class UdelarGraphRepository:
             work: Work object
             keyword: WorkKeyword object
         """
-        query = """
-        MATCH (w:Work {normalized_title: $normalized_title})
-        MERGE (k:Keyword {keyword: $keyword})
-        MERGE (w)-[:KEYWORD]->(k)
-        """
-        tx.run(query, normalized_title=work.normalized_title, keyword=keyword.keyword)
+        self._create_work_keyword_batch_tx(tx, [(work, keyword)])
 
     def _create_work_keyword_batch_tx(
         self, tx: ManagedTransaction, rels: list[tuple[Work, WorkKeyword]]
     ):
         """Create multiple work keyword relationships in the transaction.
 
+        All the rows are sent in a single `UNWIND` statement.
+
         Args:
             tx: Neo4j transaction
             rels: List of (Work, WorkKeyword) tuples to create relationships for
         """
-        for w, k in rels:
-            self._create_work_keyword_tx(tx, w, k)
+        tx.run(CREATE_WORK_KEYWORD_QUERY, rows=[work_keyword_row(r) for r in rels])
 
     def create_work_keyword(self, work: Work, keyword: str):
         """Create a single work keyword relationship.
@@ -238,15 +578,19 @@ class UdelarGraphRepository:
         Args:
             rels: List of (Work, WorkKeyword) tuples to create relationships for
         """
-        with self.driver.session() as session:
-            session.execute_write(self._create_work_keyword_batch_tx, rels)
+        self._write_partitioned(
+            self._create_work_keyword_batch_tx,
+            rels,
+            key=work_keyword_key,
+            desc="Work keywords",
+        )
 
     def _create_people_to_work_tx(
         self,
         tx: ManagedTransaction,
         person: Person,
         work: Work,
-        rel: Literal["AUTHOR_OF", "CONTRIBUTOR_OF"],
+        rel: PeopleToWorkRel,
     ):
         """Create a person-work relationship in the transaction.
 
@@ -256,34 +600,27 @@ class UdelarGraphRepository:
             work: Work object
             rel: Relationship type ("AUTHOR_OF" or "CONTRIBUTOR_OF")
         """
-        query = f"""\
-        MATCH
-            (p:Person {{normalized_name: $normalized_name}}),
-            (w:Work {{normalized_title: $normalized_title}})
-        MERGE (p)-[:{rel}]->(w)
-        """
-        tx.run(
-            query,
-            normalized_name=person.normalized_name,
-            normalized_title=work.normalized_title,
-            rel=rel,
-        )
+        self._create_people_to_work_batch_tx(tx, [(person, work)], rel)
 
     def _create_people_to_work_batch_tx(
         self,
         tx: ManagedTransaction,
         rels: list[tuple[Person, Work]],
-        rel: Literal["AUTHOR_OF", "CONTRIBUTOR_OF"],
+        rel: PeopleToWorkRel,
     ):
         """Create multiple person-work relationships in the transaction.
 
+        All the rows are sent in a single `UNWIND` statement.
+
         Args:
             tx: Neo4j transaction
             rels: List of (Person, Work) tuples to create relationships for
             rel: Relationship type ("AUTHOR_OF" or "CONTRIBUTOR_OF")
         """
-        for p, w in rels:
-            self._create_people_to_work_tx(tx, p, w, rel)
+        tx.run(
+            CREATE_PEOPLE_TO_WORK_QUERY.format(rel=rel),
+            rows=[people_to_work_row(r) for r in rels],
+        )
 
     def create_authorship_relationship(self, person: Person, work: Work):
         """Create a single authorship relationship.
@@ -304,13 +641,97 @@ class UdelarGraphRepository:
             )
 
     def create_authorship_relationship_batch(self, rels: list[tuple[Person, Work]]):
-        with self.driver.session() as session:
-            session.execute_write(
-                self._create_people_to_work_batch_tx, rels, "AUTHOR_OF"
-            )
+        self._write_partitioned(
+            self._create_people_to_work_batch_tx,
+            rels,
+            "AUTHOR_OF",
+            key=people_to_work_key,
+            desc="Authorships",
+        )
 
     def create_contributor_relationship_batch(self, rels: list[tuple[Person, Work]]):
-        with self.driver.session() as session:
-            session.execute_write(
-                self._create_people_to_work_batch_tx, rels, "CONTRIBUTOR_OF"
-            )
+        self._write_partitioned(
+            self._create_people_to_work_batch_tx,
+            rels,
+            "CONTRIBUTOR_OF",
+            key=people_to_work_key,
+            desc="Contributions",
+        )
+
+    def _delete_batch_tx(self, tx: ManagedTransaction, rows: list[dict], query: str):
+        """Run a delete query over multiple rows in the transaction.
+
+        Args:
+            tx: Neo4j transaction
+            rows: Rows with the keys of the nodes or relationships to delete
+            query: One of the `DELETE_*_QUERY` queries
+        """
+        tx.run(query, rows=rows)
+
+    def delete_person_batch(self, persons: list[Person]):
+        """Delete multiple person nodes and their relationships.
+
+        Args:
+            persons: List of Person objects to delete
+        """
+        rows = [{"normalized_name": p.normalized_name} for p in persons]
+        self._write_chunked(
+            self._delete_batch_tx, rows, DELETE_PEOPLE_QUERY, desc="Deleting people"
+        )
+
+    def delete_works_batch(self, works: list[Work]):
+        """Delete multiple work nodes and their relationships.
+
+        Args:
+            works: List of Work objects to delete
+        """
+        rows = [{"normalized_title": w.normalized_title} for w in works]
+        self._write_chunked(
+            self._delete_batch_tx, rows, DELETE_WORKS_QUERY, desc="Deleting works"
+        )
+
+    def delete_work_type_batch(self, rels: list[tuple[Work, WorkType]]):
+        """Delete multiple work type relationships, and the types left unused.
+
+        Args:
+            rels: List of (Work, WorkType) tuples to delete relationships for
+        """
+        self._write_chunked(
+            self._delete_batch_tx,
+            [work_type_row(r) for r in rels],
+            DELETE_WORK_TYPE_QUERY,
+            desc="Deleting work types",
+        )
+        if rels:
+            self.driver.execute_query(DELETE_ORPHAN_TERMS_QUERY)
+
+    def delete_work_keyword_batch(self, rels: list[tuple[Work, WorkKeyword]]):
+        """Delete multiple work keyword relationships, and the keywords left unused.
+
+        Args:
+            rels: List of (Work, WorkKeyword) tuples to delete relationships for
+        """
+        self._write_chunked(
+            self._delete_batch_tx,
+            [work_keyword_row(r) for r in rels],
+            DELETE_WORK_KEYWORD_QUERY,
+            desc="Deleting work keywords",
+        )
+        if rels:
+            self.driver.execute_query(DELETE_ORPHAN_TERMS_QUERY)
+
+    def delete_authorship_relationship_batch(self, rels: list[tuple[Person, Work]]):
+        self._write_chunked(
+            self._delete_batch_tx,
+            [people_to_work_row(r) for r in rels],
+            DELETE_PEOPLE_TO_WORK_QUERY.format(rel="AUTHOR_OF"),
+            desc="Deleting authorships",
+        )
+
+    def delete_contributor_relationship_batch(self, rels: list[tuple[Person, Work]]):
+        self._write_chunked(
+            self._delete_batch_tx,
+            [people_to_work_row(r) for r in rels],
+            DELETE_PEOPLE_TO_WORK_QUERY.format(rel="CONTRIBUTOR_OF"),
+            desc="Deleting contributions",
+        )
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from typing import Literal
+
+from loguru import logger
+from neo4j import Driver as Neo4jDriver
+from neo4j.exceptions import Neo4jError
+
+UNIQUENESS_TYPES = {"UNIQUENESS", "NODE_PROPERTY_UNIQUENESS"}
+
+
+@dataclass(frozen=True)
+class SchemaItem:
+    """A constraint or index the loaders rely on.
+
+    Attributes:
+        name: Name used when creating the item
+        kind: "unique" for a uniqueness constraint or "lookup" for a token lookup index
+        entity: "NODE" or "RELATIONSHIP"
+        label: Node label, `None` for lookup indexes
+        property: Constrained property, `None` for lookup indexes
+    """
+
+    name: str
+    kind: Literal["unique", "lookup"]
+    entity: Literal["NODE", "RELATIONSHIP"] = "NODE"
+    label: str | None = None
+    property: str | None = None
+
+    def create_query(self) -> str:
+        if self.kind == "unique":
+            return (
+                f"CREATE CONSTRAINT {self.name} IF NOT EXISTS "
+                f"FOR (n:{self.label}) REQUIRE n.{self.property} IS UNIQUE"
+            )
+        if self.entity == "NODE":
+            return (
+                f"CREATE LOOKUP INDEX {self.name} IF NOT EXISTS "
+                "FOR (n) ON EACH labels(n)"
+            )
+        return (
+            f"CREATE LOOKUP INDEX {self.name} IF NOT EXISTS "
+            "FOR ()-[r]-() ON EACH type(r)"
+        )
+
+    def __str__(self) -> str:
+        if self.kind == "unique":
+            return f"UNIQUE :{self.label}({self.property})"
+        return f"LOOKUP {self.entity.lower()}s"
+
+
+SCHEMA: list[SchemaItem] = [
+    SchemaItem(
+        "person_normalized_name", "unique", label="Person", property="normalized_name"
+    ),
+    SchemaItem(
+        "work_normalized_title", "unique", label="Work", property="normalized_title"
+    ),
+    SchemaItem("work_type_type", "unique", label="WorkType", property="type"),
+    SchemaItem("keyword_keyword", "unique", label="Keyword", property="keyword"),
+    SchemaItem("node_label_lookup", "lookup", entity="NODE"),
+    SchemaItem("relationship_type_lookup", "lookup", entity="RELATIONSHIP"),
+]
+
+
+def _is_present(item: SchemaItem, constraints: list[dict], indexes: list[dict]):
+    """Check if an equivalent item exists, regardless of the name it was created with"""
+    if item.kind == "unique":
+        return any(
+            c["type"] in UNIQUENESS_TYPES
+            and c["labelsOrTypes"] == [item.label]
+            and c["properties"] == [item.property]
+            for c in constraints
+        )
+    return any(
+        i["type"] == "LOOKUP" and i["entityType"] == item.entity for i in indexes
+    )
+
+
+def missing_schema(driver: Neo4jDriver) -> list[SchemaItem]:
+    """Return the schema items that are not present on the database."""
+    constraints = [
+        c.data()
+        for c in driver.execute_query(
+            "SHOW CONSTRAINTS YIELD type, labelsOrTypes, properties"
+        ).records
+    ]
+    indexes = [
+        i.data()
+        for i in driver.execute_query("SHOW INDEXES YIELD type, entityType").records
+    ]
+    return [item for item in SCHEMA if not _is_present(item, constraints, indexes)]
+
+
+def create_schema(driver: Neo4jDriver) -> list[SchemaItem]:
+    """Create the missing constraints and indexes.
+
+    Creation is idempotent, items that already exist are left untouched. A
+    uniqueness constraint can't be created while duplicated values exist, in that
+    case the error is logged and the remaining items are still created.
+
+    Returns:
+        The items that could not be created.
+    """
+    failed: list[SchemaItem] = []
+    for item in missing_schema(driver):
+        logger.info(f"Creating {item}")
+        try:
+            driver.execute_query(item.create_query())
+        except Neo4jError as e:
+            logger.error(f"Failed to create {item}: {e.message}")
+            if item.label == "Person":
+                logger.error("Run `udegraph dedupe-people` to merge duplicated people")
+            failed.append(item)
+    driver.execute_query("CALL db.awaitIndexes(300)")
+    return failed
@@ -0,0 +1,22 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from udelar_graph.bench.generate import (
+    generate_colibri_tree,
+    generate_extracted_names,
+    generate_openalex_csv,
+    generate_people,
+)
+
+
+@pytest.fixture
+def sources(tmp_path: Path) -> Path:
+    """Small synthetic Colibri tree, extracted names and OpenAlex CSV."""
+    rng = random.Random(0)
+    people = generate_people(60, 0.1, rng)
+    titles = generate_colibri_tree(tmp_path / "colibri", people, 120, rng)
+    generate_extracted_names(tmp_path / "extracted_names.json", people)
+    generate_openalex_csv(tmp_path / "openalex.csv", people, titles, 300, rng)
+    return tmp_path
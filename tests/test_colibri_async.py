@@ -0,0 +1,98 @@
+import asyncio
+import gc
+import warnings
+from pathlib import Path
+
+import pytest
+
+import udelar_graph.load.colibri as colibri
+from udelar_graph.load.colibri import (
+    populate_graph_colibri,
+    populate_graph_colibri_async,
+)
+from udelar_graph.memory_repository import REL_TYPES, InMemoryGraphRepository
+from udelar_graph.profiling import record_stages
+
+
+class AsyncMemoryRepository:
+    """Async facade over `InMemoryGraphRepository`, yielding on every write."""
+
+    def __init__(self, delay: float = 0.0):
+        self.graph = InMemoryGraphRepository()
+        self.delay = delay
+        self.cancelled: list[str] = []
+
+    def __getattr__(self, name):
+        method = getattr(self.graph, name)
+
+        async def write(rows):
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled.append(name)
+                raise
+            method(rows)
+
+        return write
+
+
+def _load_async(repository, workdir: Path):
+    return populate_graph_colibri_async(
+        repository,
+        data_dir=workdir / "colibri",
+        extracted_names_path=workdir / "extracted_names.json",
+        output_dir=workdir,
+    )
+
+
+def test_async_load_matches_sync_load_and_records_stages(sources: Path):
+    repository = AsyncMemoryRepository()
+    with record_stages() as stages:
+        asyncio.run(_load_async(repository, sources))
+
+    expected = InMemoryGraphRepository()
+    populate_graph_colibri(
+        expected,
+        data_dir=sources / "colibri",
+        extracted_names_path=sources / "extracted_names.json",
+        output_dir=sources,
+    )
+    assert repository.graph.people == expected.people
+    assert repository.graph.works == expected.works
+    for rel in REL_TYPES:
+        assert set(repository.graph.relationships(rel)) == set(
+            expected.relationships(rel)
+        )
+    assert {
+        "colibri.read",
+        "colibri.group_names",
+        "colibri.resolve_names",
+        "colibri.write_works",
+        "colibri.write_people",
+        "colibri.write_authorships",
+    } <= {s.name for s in stages}
+
+
+def test_failed_async_load_cancels_the_works_writes(
+    sources: Path, monkeypatch: pytest.MonkeyPatch
+):
+    def fail(*_):
+        raise RuntimeError("grouping failed")
+
+    monkeypatch.setattr(colibri, "_get_people_list", fail)
+    repository = AsyncMemoryRepository(delay=10.0)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="grouping failed"):
+            await _load_async(repository, sources)
+        # nothing keeps writing once the load returned
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        asyncio.run(run())
+        gc.collect()
+
+    assert repository.cancelled == ["create_works_batch"]
+    assert repository.graph.works == {}
+    assert not [w for w in caught if "never retrieved" in str(w.message)]
@@ -0,0 +1,118 @@
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from udelar_graph.delta import DeltaRepository
+from udelar_graph.load.colibri import load_colibri_outputs, populate_graph_colibri
+from udelar_graph.load.openalex import load_openalex_works, scan_openalex_works
+from udelar_graph.memory_repository import REL_TYPES, InMemoryGraphRepository
+
+WRITE_METHODS = (
+    "create_person_batch",
+    "create_works_batch",
+    "update_works_batch",
+    "create_work_type_batch",
+    "create_work_keyword_batch",
+    "create_authorship_relationship_batch",
+    "create_contributor_relationship_batch",
+)
+
+
+@dataclass
+class RecordingRepository(InMemoryGraphRepository):
+    """Counts the rows sent to each batch write method."""
+
+    writes: Counter = field(default_factory=Counter)
+
+    def __getattribute__(self, name):
+        attr = super().__getattribute__(name)
+        if name not in WRITE_METHODS:
+            return attr
+
+        def record(rows):
+            self.writes[name] += len(rows)
+            return attr(rows)
+
+        return record
+
+
+def _load(repository, workdir: Path, manifest: Path):
+    colibri = DeltaRepository(repository, "colibri", manifest)
+    populate_graph_colibri(
+        colibri,
+        data_dir=workdir / "colibri",
+        extracted_names_path=workdir / "extracted_names.json",
+        output_dir=workdir,
+    )
+    colibri.commit()
+    people, works = load_colibri_outputs(
+        workdir / "colibri_people.json", workdir / "colibri_works.json"
+    )
+    openalex = DeltaRepository(repository, "openalex", manifest)
+    load_openalex_works(
+        scan_openalex_works(workdir / "openalex.csv", workdir / "parquet"),
+        openalex,
+        existing_people=people,
+        existing_works=works,
+    )
+    openalex.commit()
+
+
+def _full_load(workdir: Path) -> InMemoryGraphRepository:
+    repository = InMemoryGraphRepository()
+    populate_graph_colibri(
+        repository,
+        data_dir=workdir / "colibri",
+        extracted_names_path=workdir / "extracted_names.json",
+        output_dir=workdir,
+    )
+    people, works = load_colibri_outputs(
+        workdir / "colibri_people.json", workdir / "colibri_works.json"
+    )
+    load_openalex_works(
+        scan_openalex_works(workdir / "openalex.csv", workdir / "parquet"),
+        repository,
+        existing_people=people,
+        existing_works=works,
+    )
+    return repository
+
+
+def _assert_same_graph(a: InMemoryGraphRepository, b: InMemoryGraphRepository):
+    assert a.people == b.people
+    assert a.works == b.works
+    for rel in REL_TYPES:
+        assert set(a.relationships(rel)) == set(b.relationships(rel))
+
+
+def test_unchanged_rerun_of_two_sources_sends_no_writes(sources: Path):
+    repository = RecordingRepository()
+    manifest = sources / "manifest.json"
+    _load(repository, sources, manifest)
+    assert repository.writes["update_works_batch"] > 0
+
+    repository.writes.clear()
+    _load(repository, sources, manifest)
+
+    assert sum(repository.writes.values()) == 0
+    _assert_same_graph(repository, _full_load(sources))
+
+
+def test_changed_colibri_work_is_enriched_again(sources: Path):
+    repository = RecordingRepository()
+    manifest = sources / "manifest.json"
+    _load(repository, sources, manifest)
+
+    path = next((sources / "colibri").glob("**/*.jsonl"))
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    rows[0]["abstract"] = "resumen nuevo"
+    rows[0]["pdf_url"] = None
+    del rows[1]
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+
+    repository.writes.clear()
+    _load(repository, sources, manifest)
+
+    assert 0 < repository.writes["create_works_batch"] < 10
+    _assert_same_graph(repository, _full_load(sources))
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+from udelar_graph.load.colibri import migrate_extracted_names, open_extracted_names
+from udelar_graph.processing.name_extraction import (
+    ExtractedNamesDB,
+    ExtractedNamesJournal,
+)
+from udelar_graph.processing.names import StructuredNameResponse
+
+JUAN = StructuredNameResponse(
+    surnames="Pérez", first_names="Juan", institution="UdelaR", person=True
+)
+ANA = StructuredNameResponse(surnames="Gómez", first_names="Ana", person=True)
+CEIBAL = StructuredNameResponse(surnames="", first_names="Ceibal", person=False)
+
+
+def _write_json(path: Path, extracted_names: dict[str, StructuredNameResponse]):
+    path.write_text(
+        json.dumps({k: v.model_dump(mode="json") for k, v in extracted_names.items()})
+    )
+
+
+def test_db_get_and_insert(tmp_path: Path):
+    db = ExtractedNamesDB(tmp_path / "names.sqlite")
+    assert db.get("perez_juan") is None
+    assert "perez_juan" not in db
+    assert len(db) == 0
+
+    db["perez_juan"] = JUAN
+    db.update({"gomez_ana": ANA, "ceibal": CEIBAL})
+    db["perez_juan"] = JUAN.model_copy(update={"department": "FING"})
+
+    assert len(db) == 3
+    assert "gomez_ana" in db
+    assert db["gomez_ana"] == ANA
+    assert db.get("ceibal") == CEIBAL
+    assert db["perez_juan"].department == "FING"
+    assert [k for k, _ in db.items()] == ["ceibal", "gomez_ana", "perez_juan"]
+    db.close()
+
+    reopened = ExtractedNamesDB(tmp_path / "names.sqlite")
+    assert dict(reopened.items()) == {
+        "ceibal": CEIBAL,
+        "gomez_ana": ANA,
+        "perez_juan": JUAN.model_copy(update={"department": "FING"}),
+    }
+    reopened.close()
+
+
+def test_migrate_merges_the_journal(tmp_path: Path):
+    json_path = tmp_path / "names.json"
+    _write_json(json_path, {"perez_juan": JUAN, "ceibal": CEIBAL})
+    journal = ExtractedNamesJournal(tmp_path / "names.jsonl")
+    journal.append("ceibal", CEIBAL.model_copy(update={"person": True}))
+    journal.append("gomez_ana", ANA)
+    with open(journal.path, "a") as f:
+        f.write('{"name": "trunc')
+
+    assert migrate_extracted_names(json_path, tmp_path / "names.sqlite") == 3
+
+    db = ExtractedNamesDB(tmp_path / "names.sqlite")
+    assert dict(db.items()) == {
+        "ceibal": CEIBAL.model_copy(update={"person": True}),
+        "gomez_ana": ANA,
+        "perez_juan": JUAN,
+    }
+    db.close()
+
+
+def test_open_migrates_the_json_file_once(tmp_path: Path):
+    _write_json(tmp_path / "names.json", {"perez_juan": JUAN})
+
+    extracted_names = open_extracted_names(tmp_path / "names.sqlite")
+    assert isinstance(extracted_names, ExtractedNamesDB)
+    assert dict(extracted_names.items()) == {"perez_juan": JUAN}
+    extracted_names["gomez_ana"] = ANA
+    extracted_names.close()
+
+    # the store exists, so the JSON file isn't copied over it again
+    extracted_names = open_extracted_names(tmp_path / "names.sqlite")
+    assert len(extracted_names) == 2
+    extracted_names.close()
+
+    assert open_extracted_names(tmp_path / "names.json") == {"perez_juan": JUAN}
@@ -0,0 +1,52 @@
+from udelar_graph.load.colibri import join_people
+from udelar_graph.models import Person
+
+
+def test_join_people_remaps_every_alias():
+    people = [
+        Person(
+            normalized_name="perez, j",
+            aliases=["Pérez, J.", "Perez, Juan"],
+            names="Juan",
+            surnames="Pérez",
+        ),
+        Person(
+            normalized_name="perez, juan",
+            aliases=["PEREZ, JUAN"],
+            names="Juan",
+            surnames="Pérez",
+        ),
+        Person(normalized_name="gomez, a", aliases=["Gómez, A."]),
+    ]
+    people_name_mapping = {
+        "Pérez, J.": "perez, j",
+        "Perez, Juan": "perez, j",
+        "PEREZ, JUAN": "perez, juan",
+        "Gómez, A.": "gomez, a",
+    }
+
+    final = join_people(people, people_name_mapping, filter_people=set())
+
+    assert [(p.normalized_name, p.aliases) for p in final] == [
+        ("juan perez", ["Pérez, J.", "Perez, Juan", "PEREZ, JUAN"])
+    ]
+    # every alias of a renamed person points to the new name, not only one of them
+    assert people_name_mapping == {
+        "Pérez, J.": "juan perez",
+        "Perez, Juan": "juan perez",
+        "PEREZ, JUAN": "juan perez",
+        "Gómez, A.": "gomez, a",
+    }
+
+
+def test_join_people_drops_filtered_people():
+    people = [
+        Person(normalized_name="a", aliases=["A"], names="Ana", surnames="Ruiz"),
+        Person(normalized_name="b", aliases=["B"], names="Ana", surnames="Ruiz"),
+    ]
+    people_name_mapping = {"A": "a", "B": "b"}
+
+    final = join_people(people, people_name_mapping, filter_people={"b"})
+
+    assert [(p.normalized_name, p.aliases) for p in final] == [("ana ruiz", ["A"])]
+    assert people_name_mapping == {"A": "ana ruiz", "B": "b"}
@@ -0,0 +1,163 @@
+import asyncio
+import json
+from pathlib import Path
+
+import openai
+import pytest
+
+from udelar_graph.load.colibri import (
+    extract_missing_people_names,
+    populate_graph_colibri,
+    read_extracted_names,
+)
+from udelar_graph.memory_repository import InMemoryGraphRepository
+from udelar_graph.models import Person
+from udelar_graph.processing.name_extraction import (
+    ExtractedNamesJournal,
+    NameExtractionService,
+)
+from udelar_graph.processing.names import StructuredNameResponse
+
+# the request of the error isn't used when retrying
+CONNECTION_ERROR = openai.APIConnectionError(request=None)  # type: ignore[arg-type]
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed_on: asyncio.AbstractEventLoop | None = None
+
+    async def close(self):
+        self.closed_on = asyncio.get_running_loop()
+
+
+class FakeService(NameExtractionService):
+    """Answers every alias without OpenAI, failing with the errors of `failures`
+    (alias to list of errors, one per attempt) first."""
+
+    def __init__(self, failures: dict[str, list[BaseException]] | None = None, **kw):
+        kw.setdefault("requests_per_second", 1000.0)
+        kw.setdefault("backoff", 0.0)
+        kw.setdefault("local_confidence", 2.0)
+        super().__init__(client=FakeClient(), **kw)
+        self.failures = failures or {}
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.loops: set[asyncio.AbstractEventLoop] = set()
+
+    async def _request(self, alias: str) -> StructuredNameResponse | None:
+        self.calls.append(alias)
+        self.loops.add(asyncio.get_running_loop())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.failures.get(alias):
+                raise self.failures[alias].pop(0)
+            surnames, first_names = alias.split(", ")
+            return StructuredNameResponse(
+                surnames=surnames, first_names=first_names, person=True
+            )
+        finally:
+            self.in_flight -= 1
+
+
+def _people(n: int) -> list[Person]:
+    return [Person(normalized_name=f"apellido{i}_nombre{i}") for i in range(n)]
+
+
+def _with_aliases(people: list[Person]) -> list[Person]:
+    for i, person in enumerate(people):
+        person.aliases = [f"Apellido{i}, Nombre{i}"]
+    return people
+
+
+def test_requests_in_flight_are_bounded():
+    service = FakeService(max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*(service.extract(f"A{i}, B") for i in range(12)))
+
+    results = asyncio.run(run())
+    assert [r.surnames for r in results] == [f"A{i}" for i in range(12)]
+    assert service.max_in_flight == 3
+
+
+def test_retryable_errors_are_retried():
+    service = FakeService(
+        failures={"Pérez, Juan": [CONNECTION_ERROR, CONNECTION_ERROR]}, max_retries=3
+    )
+
+    result = asyncio.run(service.extract("Pérez, Juan"))
+
+    assert result is not None and result.surnames == "Pérez"
+    assert service.calls == ["Pérez, Juan"] * 3
+
+
+def test_failed_names_are_skipped(tmp_path: Path):
+    people = _with_aliases(_people(3))
+    failures: dict[str, list[BaseException]] = {
+        # retryable errors until the retries run out
+        people[0].aliases[0]: [CONNECTION_ERROR] * 2,
+        # other errors aren't retried
+        people[1].aliases[0]: [openai.OpenAIError("bad request")],
+    }
+    service = FakeService(failures, max_retries=2)
+    extracted_names: dict[str, StructuredNameResponse] = {}
+
+    asyncio.run(
+        extract_missing_people_names(
+            people, extracted_names, tmp_path / "names.json", service=service
+        )
+    )
+
+    assert service.calls.count(people[0].aliases[0]) == 2
+    assert service.calls.count(people[1].aliases[0]) == 1
+    assert list(extracted_names) == [people[2].normalized_name]
+    assert (people[0].surnames, people[2].surnames) == (None, "Apellido2")
+    assert list(read_extracted_names(tmp_path / "names.json")) == [
+        people[2].normalized_name
+    ]
+    assert not (tmp_path / "names.jsonl").exists()
+
+
+def test_interrupted_extraction_is_replayed_from_the_journal(tmp_path: Path):
+    people = _with_aliases(_people(5))
+    path = tmp_path / "names.json"
+    path.write_text("{}")
+    service = FakeService(
+        {people[3].aliases[0]: [RuntimeError("interrupted")]}, max_concurrency=1
+    )
+
+    with pytest.raises(RuntimeError, match="interrupted"):
+        asyncio.run(extract_missing_people_names(people, {}, path, service=service))
+    with open(path.with_suffix(".jsonl"), "a") as f:
+        f.write('{"name": "apellido4_nom')
+
+    assert json.loads(path.read_text()) == {}
+    assert list(read_extracted_names(path)) == [p.normalized_name for p in people[:3]]
+    journal = ExtractedNamesJournal(path.with_suffix(".jsonl")).read()
+    assert journal[people[0].normalized_name].first_names == "Nombre0"
+
+
+def test_sync_load_closes_the_service_on_its_event_loop(sources: Path):
+    path = sources / "extracted_names.json"
+    extracted_names = json.loads(path.read_text())
+    missing = sorted(extracted_names)[:5]
+    for name in missing:
+        del extracted_names[name]
+    path.write_text(json.dumps(extracted_names))
+    service = FakeService()
+
+    populate_graph_colibri(
+        InMemoryGraphRepository(),
+        data_dir=sources / "colibri",
+        extract_missing_names=True,
+        extracted_names_path=path,
+        output_dir=sources,
+        name_extraction=service,
+    )
+
+    assert len(service.calls) == 5
+    assert service._client.closed_on in service.loops
+    assert len(read_extracted_names(path)) == len(extracted_names) + 5
@@ -0,0 +1,64 @@
+import pytest
+
+from udelar_graph.processing.names import parse_name_locally
+
+
+@pytest.mark.parametrize(
+    "name, surnames, first_names",
+    [
+        ("Pérez, Juan", "Pérez", "Juan"),
+        ("Pérez Gómez, Juan Carlos", "Pérez Gómez", "Juan Carlos"),
+        ("Pérez, Juan Carlos", "Pérez", "Juan Carlos"),
+        ("Pérez, María del Carmen", "Pérez", "María del Carmen"),
+        ("van der Berg, Anna", "van der Berg", "Anna"),
+        ("De León, J. C.", "De León", "J. C."),
+        ("O'Brien, Ana", "O'Brien", "Ana"),
+    ],
+)
+def test_accepted_names(name: str, surnames: str, first_names: str):
+    extracted_name, confidence = parse_name_locally(name)
+
+    assert extracted_name is not None
+    assert (extracted_name.surnames, extracted_name.first_names) == (
+        surnames,
+        first_names,
+    )
+    assert extracted_name.person
+    assert confidence == 1.0
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "Juan Pérez",
+        "Pérez, Juan, Gómez",
+        "Pérez, ",
+        "de la, Juan",
+        "Pérez 2, Juan",
+        "Facultad de Ingeniería, Udelar",
+        "Pérez, Dr. Juan",
+        "Pérez, Juan et al.",
+    ],
+)
+def test_rejected_names(name: str):
+    assert parse_name_locally(name) == (None, 0.0)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        # first names written first
+        "Juan Carlos, Pérez",
+        "Juan, Pérez Gómez",
+        # a single word after the comma that isn't a common first name
+        "Pérez, Gómez",
+        "PÉREZ, JUAN",
+        "pérez, juan",
+        "Pérez Gómez Silva Castro, Juan",
+    ],
+)
+def test_low_confidence_names(name: str):
+    extracted_name, confidence = parse_name_locally(name)
+
+    assert extracted_name is not None
+    assert confidence < 0.9